@@ -1,6 +1,7 @@
 # app.py
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response, Response
+import functools
 import os
 import json
 from werkzeug.utils import secure_filename
@@ -9,11 +10,16 @@ from werkzeug.utils import secure_filename
 from extract.preprocess import preprocess_document
 from extract.fetch_html import extract_html
 from extract.fetch_pdf import extract_pdf
-from extract.llm_infer import extract_api_endpoints
+from extract.llm_infer import extract_api_endpoints, reinfer_endpoints
 from extract.postprocess import parse_llm_output
+from extract.openapi import import_openapi, import_linked_spec, export_openapi, SPEC_EXTENSIONS
+from extract.streaming import intermediate_paths
 
 # Phase 2: Code generation
-from generate.codegen import generate_go_code
+from generate.codegen import generate_code
+
+# Observability
+from extract.metrics import trace, get_trace, render_prometheus
 
 app = Flask(__name__)
 app.config["UPLOAD_FOLDER"] = "uploads"
@@ -21,10 +27,28 @@ os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
 EXTRACTED_FILE = "output/extracted_endpoints.json"
 SELECTED_FILE = "output/selected_apis.json"
+# JSON Lines intermediates when PROJECTZ_LOW_MEMORY is set
+RAW_FILE, CLEANED_FILE = intermediate_paths("output")
+
+def traced(name):
+    """
+    Runs a view inside a per-job trace. The trace id is taken from X-Request-ID
+    when given and returned in X-Trace-Id; fetch the spans from /traces/<id>.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with trace(name, trace_id=request.headers.get("X-Request-ID"), path=request.path) as trace_id:
+                response = make_response(view(*args, **kwargs))
+            response.headers["X-Trace-Id"] = trace_id
+            return response
+        return wrapper
+    return decorator
 
 # -------------------- Phase 1: Upload & Extract --------------------
 
 @app.route("/upload", methods=["POST"])
+@traced("upload")
 def upload():
     if request.content_type and "multipart/form-data" in request.content_type:
         if "file" not in request.files:
@@ -38,14 +62,24 @@ def upload():
         file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
         file.save(file_path)
 
-        extract_pdf(file_path, output_path="output/raw_input.json")
+        if filename.lower().endswith(SPEC_EXTENSIONS):
+            if import_openapi(file_path, EXTRACTED_FILE) is None:
+                return jsonify({"error": "File is not an OpenAPI/Swagger spec"}), 400
+            return jsonify({"message": "OpenAPI spec imported."}), 200
+
+        extract_pdf(file_path, output_path=RAW_FILE)
 
     elif request.is_json:
         json_data = request.get_json()
         if "url" not in json_data:
             return jsonify({"error": "Missing 'url' field in JSON"}), 400
         url = json_data["url"]
-        extract_html(url, output_path="output/raw_input.json")
+        if import_openapi(url, EXTRACTED_FILE) is not None:
+            return jsonify({"message": "OpenAPI spec imported."}), 200
+
+        extract_html(url, output_path=RAW_FILE)
+        if import_linked_spec(RAW_FILE, EXTRACTED_FILE) is not None:
+            return jsonify({"message": "Linked OpenAPI spec imported."}), 200
 
     else:
         return jsonify({
@@ -53,14 +87,14 @@ def upload():
         }), 400
 
     chunks = preprocess_document(
-        "output/raw_input.json", chunk_size=12000, output_path="output/cleaned_input.json"
+        RAW_FILE, chunk_size=12000, output_path=CLEANED_FILE
     )
 
     if len(chunks) == 0:
         return jsonify({"error": "No usable content found in input."}), 400
 
-    extract_api_endpoints("output/cleaned_input.json", "output/llm_output.txt")
-    parse_llm_output("output/llm_output.txt", EXTRACTED_FILE)
+    extract_api_endpoints(CLEANED_FILE, "output/llm_output.txt")
+    parse_llm_output("output/llm_output.txt", EXTRACTED_FILE, CLEANED_FILE)
 
     return jsonify({"message": "Upload and extraction successful."}), 200
 
@@ -85,6 +119,44 @@ def list_endpoint_summaries():
     ]
     return jsonify(summarized), 200
 
+# -------------------- Phase 1: Targeted Re-extraction --------------------
+
+@app.route("/reinfer", methods=["POST"])
+@traced("reinfer")
+def reinfer():
+    if not os.path.exists(EXTRACTED_FILE):
+        return jsonify({"error": "No extracted data available."}), 404
+
+    endpoint_ids = (request.get_json(silent=True) or {}).get("endpoint_ids", [])
+    if not isinstance(endpoint_ids, list) or not endpoint_ids or \
+            not all(isinstance(i, int) and not isinstance(i, bool) for i in endpoint_ids):
+        return jsonify({"error": "'endpoint_ids' must be a non-empty list of integers"}), 400
+
+    try:
+        updated = reinfer_endpoints(endpoint_ids, EXTRACTED_FILE, CLEANED_FILE, "output/llm_output.txt")
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if updated is None:
+        return jsonify({
+            "error": "No source chunk found for the selected endpoints; run a full extraction first."
+        }), 409
+
+    return jsonify({
+        "message": "Re-extraction complete",
+        "endpoints": updated
+    }), 200
+
+# -------------------- Phase 1: OpenAPI Export --------------------
+
+@app.route("/openapi", methods=["GET"])
+def openapi_export():
+    if not os.path.exists(EXTRACTED_FILE):
+        return jsonify({"error": "No extracted data available."}), 404
+
+    spec = export_openapi(EXTRACTED_FILE)
+    return jsonify(spec), 200
+
 # -------------------- Phase 1: Endpoint Selection --------------------
 
 @app.route("/select", methods=["POST"])
@@ -119,16 +191,51 @@ def select_endpoints():
 # -------------------- Phase 2: Code Generation --------------------
 
 @app.route("/generate-code", methods=["GET"])
+@traced("generate-code")
 def generate_code_route():
     try:
-        code_snippets = generate_go_code()
+        languages = request.args.get("languages")
+        languages = [lang.strip() for lang in languages.split(",") if lang.strip()] if languages else None
+        code_snippets, outputs = generate_code(languages)
         return jsonify({
             "message": "Code generated successfully",
-            "functions_generated": len(code_snippets)
+            "functions_generated": len(code_snippets),
+            "outputs": outputs
         }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/verify-code", methods=["GET"])
+@traced("verify-code")
+def verify_code_route():
+    # Imported here so the HTTP server and subprocess plumbing load only when used.
+    from generate.verify import verify_generated_code
+    try:
+        report = verify_generated_code(
+            concurrency=int(request.args.get("concurrency", 8)),
+            iterations=int(request.args.get("iterations", 20))
+        )
+        return jsonify(report), 200 if report["passed"] else 422
+    except (FileNotFoundError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# -------------------- Observability --------------------
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/traces/<trace_id>", methods=["GET"])
+def trace_detail(trace_id):
+    data = get_trace(trace_id)
+    if data is None:
+        return jsonify({"error": "Trace not found."}), 404
+    return jsonify(data), 200
+
 # -------------------- Health Check --------------------
 
 @app.route("/", methods=["GET"])
@@ -0,0 +1,96 @@
+# benchmarks/bench_imports.py
+#
+# Guards cold-start cost of the entry points. Each module is imported in a fresh
+# interpreter several times; the script fails if the median import time exceeds
+# its budget, if a heavy dependency is loaded eagerly, or if the import fails.
+# A target is skipped only when the missing module is one it is allowed to load.
+#
+#   python benchmarks/bench_imports.py [--runs 7] [--budget-scale 1.0]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that only specific stages need; none may be loaded by a bare import.
+HEAVY_MODULES = ["selenium", "bs4", "fitz", "requests", "dotenv", "flask"]
+
+# module -> (budget in ms, extra modules that are allowed for it)
+TARGETS = {
+    "main": (100, []),
+    "extract.batch": (100, []),
+    "generate.codegen": (50, []),
+    "app": (600, ["flask"]),
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    import {module}
+except ModuleNotFoundError as e:
+    print(json.dumps({{"missing": (e.name or "").split(".")[0], "error": str(e)}}))
+    sys.exit(0)
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, runs):
+    """
+    Returns (median_ms, loaded_heavy_modules), or (None, failure) where failure
+    is {"missing": top-level module or None, "error": message}.
+    """
+    samples = []
+    loaded = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            return None, {"missing": None, "error": lines[-1] if lines else f"exit {result.returncode}"}
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        if "missing" in data:
+            return None, data
+        samples.append(data["ms"])
+        loaded.update(data["loaded"])
+    return statistics.median(samples), sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for ProjectZ entry points")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-scale", type=float, default=1.0,
+                        help="Multiply every budget, e.g. 2.0 on slow CI machines")
+    args = parser.parse_args()
+
+    failed = False
+    for module, (budget, allowed) in TARGETS.items():
+        median, loaded = measure(module, args.runs)
+        if median is None:
+            if loaded["missing"] in allowed:
+                print(f"[SKIP] {module}: allowed dependency not installed ({loaded['error']})")
+                continue
+            failed = True
+            eager = " (heavy dependency imported eagerly)" if loaded["missing"] in HEAVY_MODULES else ""
+            print(f"[FAIL] {module}: import failed{eager}: {loaded['error']}")
+            continue
+
+        eager = [m for m in loaded if m not in allowed]
+        limit = budget * args.budget_scale
+        status = "OK" if median <= limit and not eager else "FAIL"
+        failed = failed or status == "FAIL"
+        extra = f", eagerly loads: {', '.join(eager)}" if eager else ""
+        print(f"[{status}] {module}: {median:.1f} ms (budget {limit:.0f} ms){extra}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
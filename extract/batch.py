@@ -0,0 +1,216 @@
+# extract/batch.py
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .fetch_html import extract_html
+from .fetch_pdf import extract_pdf
+from .preprocess import preprocess_document
+from .llm_infer import extract_api_endpoints, set_llm_concurrency
+from .postprocess import parse_llm_output
+from .openapi import import_openapi, import_linked_spec
+from .streaming import intermediate_paths
+
+BATCH_OUTPUT_DIR = "output/batch"
+STATE_FILE = "state.json"
+
+# Stages in pipeline order. A document resumes after the last one recorded in its state file.
+STAGES = ["extract", "preprocess", "infer", "postprocess"]
+
+# ---------------- Inputs ----------------
+
+def read_manifest(path):
+    """
+    Reads inputs from a manifest: a JSON list, or a text file with one URL or
+    path per line (blank lines and # comments are ignored).
+    """
+    with open(path, "r") as f:
+        text = f.read()
+
+    if path.lower().endswith(".json"):
+        return [str(item).strip() for item in json.loads(text)]
+
+    return [line.strip() for line in text.splitlines()
+            if line.strip() and not line.strip().startswith("#")]
+
+def expand_inputs(patterns, manifest=None):
+    """
+    Expands glob patterns, keeps URLs and plain paths as-is, appends manifest
+    entries and drops duplicates while preserving order.
+    """
+    inputs = read_manifest(manifest) if manifest else []
+    for pattern in patterns or []:
+        if pattern.startswith("http") or not glob.has_magic(pattern):
+            inputs.append(pattern)
+        else:
+            inputs.extend(sorted(glob.glob(pattern)))
+    return list(dict.fromkeys(inputs))
+
+def document_id(input_path):
+    """
+    Stable, filesystem-safe directory name for one input.
+    """
+    base = os.path.basename(input_path.rstrip("/")) or input_path
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", base).strip("-").lower()[:60] or "doc"
+    digest = hashlib.sha1(input_path.encode("utf-8")).hexdigest()[:8]
+    return f"{slug}-{digest}"
+
+# ---------------- State ----------------
+
+def load_state(doc_dir):
+    path = os.path.join(doc_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"completed": []}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"completed": []}
+
+def save_state(doc_dir, state):
+    # Write-then-rename so a crash never leaves a truncated state file behind.
+    path = os.path.join(doc_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def mark_completed(doc_dir, state, stage):
+    state["completed"].append(stage)
+    save_state(doc_dir, state)
+
+# ---------------- Pipeline ----------------
+
+def document_paths(doc_dir, low_memory=False):
+    raw_path, cleaned_path = intermediate_paths(doc_dir, low_memory)
+    return {
+        "raw": raw_path,
+        "cleaned": cleaned_path,
+        "llm": os.path.join(doc_dir, "llm_output.txt"),
+        "endpoints": os.path.join(doc_dir, "extracted_endpoints.json")
+    }
+
+def run_extract(input_path, paths, limits):
+    """
+    Returns "done" when a published OpenAPI spec short-circuits the rest
+    of the pipeline, otherwise "ok" or "failed".
+    """
+    if import_openapi(input_path, paths["endpoints"]) is not None:
+        return "done"
+
+    if input_path.startswith("http"):
+        with limits["browsers"]:
+            extract_html(input_path, output_path=paths["raw"])
+        if import_linked_spec(paths["raw"], paths["endpoints"]) is not None:
+            return "done"
+    elif input_path.lower().endswith(".pdf"):
+        # PyMuPDF is not thread-safe, so PDFs are parsed in worker processes.
+        limits["pdf_pool"].submit(extract_pdf, input_path, paths["raw"]).result()
+    else:
+        print(f"Unsupported input type, skipping: {input_path}")
+        return "failed"
+
+    return "ok" if os.path.exists(paths["raw"]) else "failed"
+
+def run_document(input_path, output_dir, limits, chunk_size=12000, low_memory=False):
+    """
+    Runs one document through the pipeline, skipping stages already recorded
+    in its state file. Returns a summary dict for the batch report.
+    """
+    doc_dir = os.path.join(output_dir, document_id(input_path))
+    os.makedirs(doc_dir, exist_ok=True)
+    state = load_state(doc_dir)
+    state["input"] = input_path
+    # A resumed document keeps the intermediate format it was started with.
+    state["low_memory"] = state.get("low_memory", low_memory)
+    paths = document_paths(doc_dir, state["low_memory"])
+    completed = state["completed"]
+
+    def result(status, stage):
+        return {"input": input_path, "status": status, "stage": stage, "output": doc_dir}
+
+    if len(completed) == len(STAGES):
+        print(f"[BATCH] Already complete: {input_path}")
+    elif completed:
+        print(f"[BATCH] Resuming {input_path} after stage '{completed[-1]}'")
+
+    if "extract" not in completed:
+        # Remove partial output from an interrupted run before deciding success.
+        if os.path.exists(paths["raw"]):
+            os.remove(paths["raw"])
+        outcome = run_extract(input_path, paths, limits)
+        if outcome == "failed":
+            return result("failed", "extract")
+        if outcome == "done":
+            state["completed"] = list(STAGES)
+            save_state(doc_dir, state)
+            return result("ok", "openapi")
+        mark_completed(doc_dir, state, "extract")
+
+    if "preprocess" not in completed:
+        chunks = preprocess_document(paths["raw"], chunk_size=chunk_size, output_path=paths["cleaned"])
+        if not chunks:
+            return result("empty", "preprocess")
+        mark_completed(doc_dir, state, "preprocess")
+
+    if "infer" not in completed:
+        extract_api_endpoints(cleaned_path=paths["cleaned"], raw_output_path=paths["llm"])
+        if not os.path.exists(paths["llm"]):
+            return result("failed", "infer")
+        mark_completed(doc_dir, state, "infer")
+
+    if "postprocess" not in completed:
+        parse_llm_output(paths["llm"], paths["endpoints"], paths["cleaned"])
+        mark_completed(doc_dir, state, "postprocess")
+
+    return result("ok" if os.path.exists(paths["endpoints"]) else "empty", "postprocess")
+
+def run_batch(inputs, output_dir=BATCH_OUTPUT_DIR, max_documents=4, max_browsers=2,
+              max_pdf_workers=2, max_llm=4, chunk_size=12000, low_memory=False):
+    """
+    Runs many documents concurrently in one process. Documents share global
+    limits: at most `max_browsers` headless browsers, `max_pdf_workers` PDF
+    extraction processes and `max_llm` in-flight LLM requests. Each document
+    writes to its own directory under `output_dir`; `low_memory` switches the
+    intermediates to streamed JSON Lines.
+    """
+    # Pulls in multiprocessing, so only paid for when a batch actually runs.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    set_llm_concurrency(max_llm)
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+
+    # Workers start lazily from document threads; forking a multi-threaded process
+    # can copy a held lock (metrics, stdout) into the child and deadlock it.
+    pdf_context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=max_pdf_workers, mp_context=pdf_context) as pdf_pool, \
+            ThreadPoolExecutor(max_workers=max_documents) as doc_pool:
+        limits = {"browsers": threading.BoundedSemaphore(max_browsers), "pdf_pool": pdf_pool}
+        futures = {
+            doc_pool.submit(run_document, path, output_dir, limits, chunk_size, low_memory): path
+            for path in inputs
+        }
+        for future in as_completed(futures):
+            try:
+                res = future.result()
+            except Exception as e:
+                res = {"input": futures[future], "status": "failed", "error": str(e)}
+            print(f"[BATCH] {res['status'].upper()}: {res['input']}")
+            results.append(res)
+
+    order = {path: i for i, path in enumerate(inputs)}
+    results.sort(key=lambda r: order[r["input"]])
+
+    summary_path = os.path.join(output_dir, "batch_summary.json")
+    with open(summary_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"[BATCH] Summary saved to: {summary_path}")
+    return results
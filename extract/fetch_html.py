@@ -3,15 +3,43 @@
 import json
 import os
 import time
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from .openapi import find_spec_links
+from .metrics import instrument_stage, record_error, annotate, LOG_DIR
+from .streaming import is_jsonl, jsonl_writer
 
+FETCH_ERROR_LOG = os.path.join(LOG_DIR, "fetch_errors.log")
 
+
+def iter_content(soup):
+    # Extract readable content
+    for tag in soup.find_all(["p", "pre", "code", "li", "h1", "h2", "h3", "span"]):
+        text = tag.get_text(strip=True)
+        if text and len(text) > 3:
+            yield text
+
+
+def iter_tables(soup):
+    for table in soup.find_all("table"):
+        headers = [th.get_text(strip=True) for th in table.find_all("th")]
+        rows = []
+        for row in table.find_all("tr"):
+            cells = [td.get_text(strip=True) for td in row.find_all("td")]
+            if cells:
+                rows.append(cells)
+        if headers or rows:
+            yield {"headers": headers, "rows": rows}
+
+
+@instrument_stage("extract_html")
 def extract_html(url, output_path="output/raw_input.json"):
+    # Selenium and BeautifulSoup are heavy; import them only when a URL is actually fetched.
+    from bs4 import BeautifulSoup
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
     print(f"Launching headless browser to fetch: {url}")
 
     chrome_options = Options()
@@ -36,34 +64,39 @@ def extract_html(url, output_path="output/raw_input.json"):
         html = driver.page_source
         soup = BeautifulSoup(html, "html.parser")
 
-        # Extract readable content
-        content = []
-        for tag in soup.find_all(["p", "pre", "code", "li", "h1", "h2", "h3", "span"]):
-            text = tag.get_text(strip=True)
-            if text and len(text) > 3:
-                content.append(text)
-
-        # Extract tables
-        tables = []
-        for table in soup.find_all("table"):
-            headers = [th.get_text(strip=True) for th in table.find_all("th")]
-            rows = []
-            for row in table.find_all("tr"):
-                cells = [td.get_text(strip=True) for td in row.find_all("td")]
-                if cells:
-                    rows.append(cells)
-            if headers or rows:
-                tables.append({"headers": headers, "rows": rows})
+        if is_jsonl(output_path):
+            blocks = tables = 0
+            with jsonl_writer(output_path) as write:
+                write({"source": url, "spec_links": find_spec_links(html, url)})
+                for text in iter_content(soup):
+                    write({"content": text})
+                    blocks += 1
+                for table in iter_tables(soup):
+                    write({"table": table})
+                    tables += 1
+            annotate(blocks=blocks, tables=tables)
+            print(f"HTML content saved to: {output_path}")
+            return
+
+        content = list(iter_content(soup))
+        tables = list(iter_tables(soup))
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, "w") as f:
-            json.dump({"content": content, "tables": tables}, f, indent=2)
+            json.dump({
+                "source": url,
+                "content": content,
+                "tables": tables,
+                "spec_links": find_spec_links(html, url)
+            }, f, indent=2)
 
+        annotate(blocks=len(content), tables=len(tables))
         print(f"HTML content saved to: {output_path}")
     except Exception as e:
         print(f"Failed to extract HTML from {url}: {e}")
-        os.makedirs("output", exist_ok=True)
-        with open("logs/fetch_errors.log", "w") as log:
-            log.write(f"[ERROR] {str(e)}\n")
+        record_error("extract_html", e)
+        os.makedirs(LOG_DIR, exist_ok=True)
+        with open(FETCH_ERROR_LOG, "a") as log:
+            log.write(f"[ERROR] {url}: {str(e)}\n")
     finally:
         driver.quit()
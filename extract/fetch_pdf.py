@@ -1,29 +1,49 @@
 # extract/fetch_pdf.py
 
-import fitz  # PyMuPDF
 import json
 import os
+from .metrics import instrument_stage, record_error, annotate
+from .streaming import is_jsonl, jsonl_writer
 
+def iter_page_texts(doc):
+    # Yields (page_number, text); page numbers are 1-based and kept for provenance.
+    for number, page in enumerate(doc, start=1):
+        text = page.get_text("text").strip()
+        if text:
+            yield number, text
+
+@instrument_stage("extract_pdf")
 def extract_pdf(pdf_path, output_path="output/raw_input.json"):
     if not os.path.exists(pdf_path):
         print(f"PDF file not found: {pdf_path}")
         return
 
+    import fitz  # PyMuPDF, imported lazily so URL-only runs never load it
+
     try:
         doc = fitz.open(pdf_path)
-        content = []
-
-        print(f"Extracting text from: {pdf_path} ({len(doc)} pages)")
-
-        for page in doc:
-            text = page.get_text("text").strip()
-            if text:
-                content.append(text)
-
-        doc.close()
+        # Closed on every path so a failed page never leaks the document in a pooled worker.
+        try:
+            print(f"Extracting text from: {pdf_path} ({len(doc)} pages)")
+            annotate(pages=len(doc))
+
+            if is_jsonl(output_path):
+                # One record per page, written as it is read: memory stays flat for any page count.
+                with jsonl_writer(output_path) as write:
+                    write({"source": pdf_path})
+                    for number, text in iter_page_texts(doc):
+                        write({"content": text, "page": number})
+                print(f"PDF content saved to: {output_path}")
+                return
+
+            pages = list(iter_page_texts(doc))
+        finally:
+            doc.close()
 
         output_data = {
-            "content": content,
+            "source": pdf_path,
+            "content": [text for _, text in pages],
+            "pages": [number for number, _ in pages],
             "tables": []  # Consistent with HTML output
         }
 
@@ -36,3 +56,4 @@ def extract_pdf(pdf_path, output_path="output/raw_input.json"):
 
     except Exception as e:
         print(f"Failed to extract PDF: {e}")
+        record_error("extract_pdf", e)
@@ -1,19 +1,41 @@
 import os
 import json
+import threading
 import time
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
+from contextlib import nullcontext
+from functools import lru_cache
+from .metrics import instrument_stage, record_error, annotate, inc, observe
+from .streaming import is_jsonl, iter_jsonl, JsonlSequence
 
 # Constants
-TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 TOGETHER_MODEL = "deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free"
 TOGETHER_URL = "https://api.together.xyz/v1/chat/completions"
-HEADERS = {
-    "Authorization": f"Bearer {TOGETHER_API_KEY}",
-    "Content-Type": "application/json"
-}
+LLM_MAX_RETRIES = 2
+# (connect, read) seconds; reasoning models can take minutes on a full chunk.
+LLM_TIMEOUT = (10, 300)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Process-wide cap on in-flight LLM requests; None means unlimited.
+_llm_slots = None
+
+
+@lru_cache(maxsize=None)
+def get_headers():
+    """
+    Loads .env and builds the request headers on first use rather than at import time.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        "Authorization": f"Bearer {os.getenv('TOGETHER_API_KEY')}",
+        "Content-Type": "application/json"
+    }
+
+
+def set_llm_concurrency(limit):
+    global _llm_slots
+    _llm_slots = threading.BoundedSemaphore(limit) if limit else None
 
 
 def build_prompt(chunk: str, index: int) -> str:
@@ -56,16 +78,92 @@ Rules:
 """.strip()
 
 
+def post_chat(payload):
+    """
+    Sends one chat completion request, retrying transient failures (connection
+    errors, timeouts, 429 and 5xx) with exponential backoff. Records latency, token usage,
+    outcome and retry metrics. Returns the message content.
+    """
+    import requests
+
+    headers = get_headers()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        elapsed = 0.0
+        try:
+            # The timer starts once a slot is held, so latency excludes queueing in batch mode.
+            with _llm_slots if _llm_slots is not None else nullcontext():
+                start = time.perf_counter()
+                try:
+                    response = requests.post(TOGETHER_URL, headers=headers, json=payload, timeout=LLM_TIMEOUT)
+                finally:
+                    elapsed = time.perf_counter() - start
+            if response.status_code in RETRY_STATUS_CODES and attempt < LLM_MAX_RETRIES:
+                raise requests.ConnectionError(f"HTTP {response.status_code}")
+            response.raise_for_status()
+        except (requests.ConnectionError, requests.Timeout):
+            observe("projectz_llm_request_seconds", elapsed)
+            inc("projectz_llm_requests_total", labels={"outcome": "error"})
+            if attempt == LLM_MAX_RETRIES:
+                raise
+            inc("projectz_llm_retries_total")
+            time.sleep(2 ** attempt)
+            continue
+        except Exception:
+            observe("projectz_llm_request_seconds", elapsed)
+            inc("projectz_llm_requests_total", labels={"outcome": "error"})
+            raise
+
+        observe("projectz_llm_request_seconds", elapsed)
+        inc("projectz_llm_requests_total", labels={"outcome": "ok"})
+        data = response.json()
+        usage = data.get("usage") or {}
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                inc("projectz_llm_tokens_total", usage[kind], labels={"kind": kind})
+        return data["choices"][0]["message"]["content"].strip()
+
+
+def infer_chunk_section(chunk, i):
+    """
+    Runs one chunk through the LLM and returns its "# --- Chunk i ---" section
+    of llm_output.txt (an ERROR section if the call failed).
+    """
+    prompt = build_prompt(chunk, i)
+
+    try:
+        payload = {
+            "model": TOGETHER_MODEL,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": 1024,
+            "temperature": 0.2
+        }
+
+        result = post_chat(payload)
+        return f"\n# --- Chunk {i} ---\n{result}\n"
+
+    except Exception as e:
+        print(f"[ERROR] Failed chunk {i}: {e}")
+        record_error("extract_api_endpoints", e)
+        return f"\n# --- Chunk {i} ERROR ---\n{e}\n"
+
+
+@instrument_stage("extract_api_endpoints")
 def extract_api_endpoints(cleaned_path="output/cleaned_input.json", raw_output_path="output/llm_output.txt"):
     if not os.path.exists(cleaned_path):
         print(f"[ERROR] Cleaned input file not found: {cleaned_path}")
         return
 
-    with open(cleaned_path, "r") as f:
-        data = json.load(f)
+    if is_jsonl(cleaned_path):
+        # Count first, then stream: only one chunk is held in memory at a time.
+        count = sum(1 for _ in iter_jsonl(cleaned_path))
+        chunks = JsonlSequence(cleaned_path, count, key="chunk")
+    else:
+        with open(cleaned_path, "r") as f:
+            data = json.load(f)
 
-    chunks = data.get("chunks", [])
+        chunks = data.get("chunks", [])
     print(f"[INFO] Loaded {len(chunks)} chunks for DeepSeek inference")
+    annotate(chunks=len(chunks))
 
     os.makedirs(os.path.dirname(raw_output_path), exist_ok=True)
 
@@ -73,29 +171,70 @@ def extract_api_endpoints(cleaned_path="output/cleaned_input.json", raw_output_p
         for i, chunk in enumerate(chunks, start=1):
             print(f"[INFO] Sending chunk {i}/{len(chunks)} to DeepSeek...")
             time.sleep(1)
+            out_file.write(infer_chunk_section(chunk, i))
 
-            prompt = build_prompt(chunk, i)
+    print(f"[INFO] Raw LLM output saved to: {raw_output_path}")
 
-            try:
-                payload = {
-                    "model": TOGETHER_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 1024,
-                    "temperature": 0.2
-                }
 
-                response = requests.post(TOGETHER_URL, headers=HEADERS, json=payload)
-                response.raise_for_status()
-                result = response.json()["choices"][0]["message"]["content"].strip()
+@instrument_stage("reinfer_endpoints")
+def reinfer_endpoints(endpoint_ids, extracted_path="output/extracted_endpoints.json",
+                      cleaned_path="output/cleaned_input.json", raw_output_path="output/llm_output.txt"):
+    """
+    Re-runs only the chunks that produced the given endpoints (indexes into
+    extracted_endpoints.json), splices the fresh sections into llm_output.txt and
+    re-parses it. Returns the endpoints now attributed to those chunks, or None
+    when there is nothing to re-infer (missing files or no chunk provenance).
+    """
+    from .postprocess import CHUNK_MARKER, parse_llm_output, section_index
+    from .preprocess import iter_cleaned
+    from .streaming import open_text, iter_sections
+
+    for path in (extracted_path, cleaned_path, raw_output_path):
+        if not os.path.exists(path):
+            print(f"[ERROR] Required file not found: {path}")
+            return None
+
+    with open(extracted_path, "r") as f:
+        endpoints = json.load(f)
+
+    indexes = sorted({
+        endpoints[i]["provenance"]["chunk"]
+        for i in endpoint_ids
+        if 0 <= i < len(endpoints) and (endpoints[i].get("provenance") or {}).get("chunk")
+    })
+    if not indexes:
+        print("[ERROR] Selected endpoints have no chunk provenance; run a full extraction first.")
+        return None
+
+    print(f"[INFO] Re-inferring {len(indexes)} chunk(s): {indexes}")
+    annotate(chunks=len(indexes))
+    wanted = set(indexes)
+    sections = {
+        i: infer_chunk_section(chunk, i)
+        for i, (chunk, _) in enumerate(iter_cleaned(cleaned_path), start=1)
+        if i in wanted
+    }
 
-                out_file.write(f"\n# --- Chunk {i} ---\n")
-                out_file.write(result + "\n")
+    # Rewrite llm_output.txt section by section, swapping in the new results.
+    tmp_path = raw_output_path + ".tmp"
+    with open_text(raw_output_path) as buffer, open(tmp_path, "w") as out_file:
+        for n, section in enumerate(iter_sections(buffer, CHUNK_MARKER)):
+            if n == 0:
+                out_file.write(section.rstrip("\n"))
+                continue
+            index = section_index(section)
+            if index in sections:
+                out_file.write(sections.pop(index))
+            else:
+                out_file.write("\n" + CHUNK_MARKER + section.rstrip("\n") + "\n")
+        for index in sorted(sections):
+            out_file.write(sections[index])
+    os.replace(tmp_path, raw_output_path)
 
-            except Exception as e:
-                print(f"[ERROR] Failed chunk {i}: {e}")
-                out_file.write(f"\n# --- Chunk {i} ERROR ---\n{e}\n")
+    parse_llm_output(raw_output_path, extracted_path, cleaned_path)
 
-    print(f"[INFO] Raw LLM output saved to: {raw_output_path}")
+    with open(extracted_path, "r") as f:
+        return [ep for ep in json.load(f) if (ep.get("provenance") or {}).get("chunk") in wanted]
 
 
 def call_llm_deepseek(prompt: str) -> str:
@@ -107,9 +246,7 @@ def call_llm_deepseek(prompt: str) -> str:
     }
 
     try:
-        response = requests.post(TOGETHER_URL, headers=HEADERS, json=payload)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"].strip()
+        return post_chat(payload)
     except Exception as e:
         print(f"[ERROR] DeepSeek prompt failed: {e}")
         return f"// ERROR: {e}"
@@ -0,0 +1,231 @@
+# extract/metrics.py
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+LOG_DIR = "logs"
+JSON_LOG_PATH = os.path.join(LOG_DIR, "pipeline.jsonl")
+JSON_LOGS_ENABLED = os.getenv("PROJECTZ_JSON_LOGS", "").lower() in ("1", "true", "yes")
+
+QUANTILES = (0.5, 0.9, 0.99)
+SUMMARY_WINDOW = 1024
+MAX_TRACES = 100
+
+_lock = threading.Lock()
+_counters = {}
+_summaries = {}
+_help = {}
+_traces = OrderedDict()
+_current_span = contextvars.ContextVar("projectz_span", default=None)
+
+# ---------------- Registry ----------------
+
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+def describe(name, text):
+    _help[name] = text
+
+def inc(name, value=1, labels=None):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, value, labels=None):
+    """
+    Records a sample in a summary: running sum and count plus a sliding
+    window of recent samples used for the quantiles.
+    """
+    key = _key(name, labels)
+    with _lock:
+        summary = _summaries.get(key)
+        if summary is None:
+            summary = _summaries[key] = {"sum": 0.0, "count": 0, "window": deque(maxlen=SUMMARY_WINDOW)}
+        summary["sum"] += value
+        summary["count"] += 1
+        summary["window"].append(value)
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
+        _traces.clear()
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def render_prometheus():
+    """
+    Renders every metric in the Prometheus text exposition format.
+    """
+    with _lock:
+        counters = dict(_counters)
+        summaries = {k: (v["sum"], v["count"], sorted(v["window"])) for k, v in _summaries.items()}
+
+    lines = []
+    for kind, series in (("counter", counters), ("summary", summaries)):
+        for name in sorted({name for name, _ in series}):
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(series.items()):
+                if metric != name:
+                    continue
+                if kind == "counter":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                total, count, window = value
+                for q in QUANTILES:
+                    lines.append(f"{name}{_format_labels(labels, {'quantile': q})} {_quantile(window, q)}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+describe("projectz_stage_duration_seconds", "Wall time spent in each pipeline stage.")
+describe("projectz_stage_runs_total", "Pipeline stage invocations.")
+describe("projectz_stage_errors_total", "Errors raised or handled inside each pipeline stage.")
+describe("projectz_chunks_total", "Cleaned chunks produced by preprocessing.")
+describe("projectz_chunk_chars", "Size of cleaned chunks in characters.")
+describe("projectz_llm_request_seconds", "Latency of individual LLM API calls.")
+describe("projectz_llm_tokens_total", "Tokens reported by the LLM API, by kind.")
+describe("projectz_llm_requests_total", "LLM API calls by outcome.")
+describe("projectz_llm_retries_total", "LLM API calls retried after a transient failure.")
+describe("projectz_cache_requests_total", "Cache lookups by cache and result (hit/miss).")
+
+# ---------------- Structured Logs ----------------
+
+def log_event(event, **fields):
+    """
+    Appends a JSON log line to logs/pipeline.jsonl when PROJECTZ_JSON_LOGS is set.
+    The active trace id, if any, is attached automatically.
+    """
+    if not JSON_LOGS_ENABLED:
+        return
+
+    current = _current_span.get()
+    record = {"ts": time.time(), "event": event}
+    if current is not None:
+        record["trace_id"] = current["trace_id"]
+    record.update(fields)
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    with _lock, open(JSON_LOG_PATH, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+# ---------------- Tracing ----------------
+
+@contextmanager
+def trace(name, trace_id=None, **attrs):
+    """
+    Starts a per-job trace and yields its id. Stages run inside it are recorded
+    as child spans and the trace can be fetched later with get_trace(trace_id).
+    """
+    trace_id = trace_id or uuid.uuid4().hex
+    root = {"trace_id": trace_id, "name": name, "attrs": attrs, "spans": []}
+    with _lock:
+        _traces[trace_id] = root
+        while len(_traces) > MAX_TRACES:
+            _traces.popitem(last=False)
+
+    with span(name, _root=root, **attrs):
+        yield trace_id
+
+def get_trace(trace_id):
+    with _lock:
+        root = _traces.get(trace_id)
+        return json.loads(json.dumps(root, default=str)) if root else None
+
+@contextmanager
+def span(name, _root=None, **attrs):
+    parent = _current_span.get()
+    root = _root or (parent["root"] if parent else None)
+    if root is None:
+        yield None
+        return
+
+    record = {
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "start": time.time(),
+        "duration_ms": None,
+        "status": "ok",
+        "attrs": dict(attrs)
+    }
+    with _lock:
+        root["spans"].append(record)
+
+    token = _current_span.set({"trace_id": root["trace_id"], "span_id": record["span_id"], "root": root, "record": record})
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        record["status"] = "error"
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        _current_span.reset(token)
+
+def annotate(**attrs):
+    """
+    Adds attributes to the innermost active span (no-op outside a trace).
+    """
+    current = _current_span.get()
+    if current is not None:
+        # Held so get_trace() never serializes attrs while they change size.
+        with _lock:
+            current["record"]["attrs"].update(attrs)
+
+# ---------------- Stage Instrumentation ----------------
+
+def record_error(stage, error):
+    """
+    Counts an error for a stage, marks the active span as failed and logs it.
+    Stages that catch and print their own exceptions call this directly.
+    """
+    inc("projectz_stage_errors_total", labels={"stage": stage})
+    current = _current_span.get()
+    if current is not None:
+        with _lock:
+            current["record"]["status"] = "error"
+            current["record"]["attrs"]["error"] = str(error)
+    log_event("error", stage=stage, error=str(error))
+
+def instrument_stage(stage):
+    """
+    Decorator recording duration, run and error counts, a trace span and a
+    JSON log line for one pipeline stage.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            inc("projectz_stage_runs_total", labels={"stage": stage})
+            with span(stage):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    record_error(stage, e)
+                    raise
+                finally:
+                    elapsed = time.perf_counter() - start
+                    observe("projectz_stage_duration_seconds", elapsed, {"stage": stage})
+                    log_event("stage", stage=stage, duration_ms=round(elapsed * 1000, 3))
+        return wrapper
+    return decorator
@@ -0,0 +1,341 @@
+# extract/openapi.py
+
+import json
+import os
+import re
+from urllib.parse import urljoin, urlsplit
+
+from .llm_utils import deduplicate_endpoints
+from .metrics import instrument_stage, annotate
+from .streaming import is_jsonl, iter_jsonl
+
+OUTPUT_JSON_PATH = "output/extracted_endpoints.json"
+OPENAPI_OUTPUT_PATH = "output/openapi.json"
+
+HTTP_METHODS = ["get", "post", "put", "delete", "patch", "head", "options"]
+SPEC_EXTENSIONS = (".json", ".yaml", ".yml")
+SPEC_LINK_PATTERN = re.compile(
+    r"""["']([^"'\s<>]*(?:openapi|swagger)[^"'\s<>]*\.(?:json|ya?ml)|[^"'\s<>]*/api-docs[^"'\s<>]*)["']""",
+    re.IGNORECASE
+)
+PATH_PARAM_PATTERN = re.compile(r"[<{]([a-zA-Z0-9_]+)[>}]?")
+
+# ---------------- Detection & Loading ----------------
+
+def is_openapi_spec(data):
+    """
+    True for OpenAPI 3.x and Swagger 2.0 documents.
+    """
+    return isinstance(data, dict) and ("openapi" in data or "swagger" in data) and "paths" in data
+
+def parse_spec_text(text):
+    """
+    Parses JSON or YAML text and returns it only if it is an OpenAPI/Swagger document.
+    YAML support requires PyYAML; without it only JSON specs are recognised.
+    """
+    try:
+        data = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        try:
+            import yaml
+        except ImportError:
+            return None
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError:
+            return None
+
+    return data if is_openapi_spec(data) else None
+
+def load_spec(source):
+    """
+    Loads a spec from a URL or local file path. Returns None if the source
+    is not an OpenAPI/Swagger document.
+    """
+    try:
+        if source.startswith("http"):
+            import requests
+
+            response = requests.get(source, timeout=15)
+            response.raise_for_status()
+            if "html" in response.headers.get("Content-Type", ""):
+                return None
+            return parse_spec_text(response.text)
+
+        if not os.path.exists(source) or not source.lower().endswith(SPEC_EXTENSIONS):
+            return None
+        with open(source, "r") as f:
+            return parse_spec_text(f.read())
+    except Exception as e:
+        print(f"[WARN] Could not load spec from {source}: {e}")
+        return None
+
+def find_spec_links(html, base_url):
+    """
+    Finds links to OpenAPI/Swagger documents in a page, including the
+    `url: "..."` setting used by Swagger UI and Redoc embeds.
+    """
+    links = []
+    for match in SPEC_LINK_PATTERN.findall(html):
+        link = urljoin(base_url, match)
+        if link not in links:
+            links.append(link)
+    return links
+
+# ---------------- Import ----------------
+
+def resolve_ref(spec, node, seen=None):
+    """
+    Follows local `$ref` pointers (e.g. #/components/schemas/User).
+    """
+    seen = seen or set()
+    while isinstance(node, dict) and "$ref" in node:
+        ref = node["$ref"]
+        if ref in seen or not ref.startswith("#/"):
+            return {}
+        seen.add(ref)
+        node = spec
+        for part in ref[2:].split("/"):
+            node = node.get(part.replace("~1", "/").replace("~0", "~"), {}) if isinstance(node, dict) else {}
+    return node
+
+def schema_type(spec, schema):
+    schema = resolve_ref(spec, schema)
+    if not isinstance(schema, dict):
+        return "string"
+    if "type" in schema:
+        # OpenAPI 3.1 allows a list such as ["integer", "null"].
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        return next((t for t in types if t != "null"), "string")
+    if "properties" in schema or "allOf" in schema:
+        return "object"
+    if "items" in schema:
+        return "array"
+    return "string"
+
+def schema_fields(spec, schema, seen=None):
+    """
+    Flattens an object schema into {field: type}, merging allOf parts.
+    """
+    seen = seen or set()
+    if isinstance(schema, dict) and "$ref" in schema:
+        if schema["$ref"] in seen:
+            return {}
+        seen = seen | {schema["$ref"]}
+    schema = resolve_ref(spec, schema)
+    if not isinstance(schema, dict):
+        return {}
+
+    fields = {}
+    for part in schema.get("allOf", []):
+        fields.update(schema_fields(spec, part, seen))
+    for name, prop in schema.get("properties", {}).items():
+        fields[name] = schema_type(spec, prop)
+    return fields
+
+def request_body_fields(spec, operation, params):
+    # OpenAPI 3
+    body = resolve_ref(spec, operation.get("requestBody", {}))
+    content = body.get("content", {}) if isinstance(body, dict) else {}
+    for media_type in ["application/json"] + list(content):
+        if media_type in content:
+            return schema_fields(spec, content[media_type].get("schema", {}))
+
+    # Swagger 2
+    fields = {}
+    for p in params:
+        if p.get("in") == "body":
+            fields.update(schema_fields(spec, p.get("schema", {})))
+        elif p.get("in") == "formData":
+            fields[p["name"]] = p.get("type", "string")
+    return fields
+
+def convert_operation(spec, path, method, operation, path_params):
+    params = {}
+    for p in path_params + operation.get("parameters", []):
+        p = resolve_ref(spec, p)
+        if isinstance(p, dict) and "name" in p:
+            params[(p["name"], p.get("in"))] = p
+    params = list(params.values())
+
+    summary = (operation.get("summary") or "").strip()
+    description = summary or (operation.get("description") or "").strip().split("\n")[0]
+    name = summary or operation.get("operationId") or f"{method.upper()} {path}"
+
+    headers = [p["name"] for p in params if p.get("in") == "header"]
+    for requirement in operation.get("security", spec.get("security", [])):
+        for scheme_name in requirement:
+            scheme = spec.get("components", {}).get("securitySchemes", {}).get(scheme_name) \
+                or spec.get("securityDefinitions", {}).get(scheme_name, {})
+            if scheme.get("type") == "apiKey" and scheme.get("in") == "header":
+                headers.append(scheme["name"])
+            elif scheme.get("type") in ("http", "oauth2", "openIdConnect", "basic"):
+                headers.append("Authorization")
+
+    return {
+        "name": name.strip(),
+        "method": method.upper(),
+        "path": path.strip(),
+        "description": description,
+        "parameters": [
+            {
+                "name": p["name"],
+                "type": schema_type(spec, p.get("schema", p)),
+                "required": bool(p.get("required", False)),
+                "in": p.get("in", "query")
+            } for p in params if p.get("in") in ("query", "path")
+        ],
+        "request_body": request_body_fields(spec, operation, params),
+        "headers": list(dict.fromkeys(headers))
+    }
+
+def base_path(spec):
+    """
+    Path prefix shared by every operation: Swagger 2 `basePath`, or the path part
+    of the first OpenAPI 3 server URL with its variables set to their defaults.
+    """
+    if "basePath" in spec:
+        prefix = spec.get("basePath") or ""
+    else:
+        servers = spec.get("servers") or [{}]
+        server = servers[0] if isinstance(servers[0], dict) else {}
+        prefix = server.get("url") or ""
+        for name, variable in (server.get("variables") or {}).items():
+            prefix = prefix.replace("{" + name + "}", str(variable.get("default", "")))
+        prefix = urlsplit(prefix).path
+    return prefix.rstrip("/")
+
+def convert_spec(spec):
+    """
+    Converts an OpenAPI 3 / Swagger 2 document into the `normalize_endpoint` schema.
+    Paths include the spec's base path, e.g. "/v2/pet/{petId}".
+    """
+    prefix = base_path(spec)
+    endpoints = []
+    for path, item in spec.get("paths", {}).items():
+        item = resolve_ref(spec, item)
+        path_params = item.get("parameters", [])
+        for method in HTTP_METHODS:
+            if method in item:
+                endpoints.append(convert_operation(spec, prefix + path, method, item[method], path_params))
+    return deduplicate_endpoints(endpoints)
+
+@instrument_stage("import_openapi")
+def import_openapi(source, out_path=OUTPUT_JSON_PATH):
+    """
+    Imports an OpenAPI/Swagger spec from a URL or file straight into
+    extracted_endpoints.json. Returns None if the source is not a spec.
+    """
+    spec = load_spec(source)
+    if spec is None:
+        return None
+
+    endpoints = convert_spec(spec)
+    annotate(endpoints=len(endpoints))
+    print(f"Imported {len(endpoints)} endpoints from spec: {source}")
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(endpoints, f, indent=2)
+
+    print(f"Saved to: {out_path}")
+    return endpoints
+
+def import_linked_spec(raw_path="output/raw_input.json", out_path=OUTPUT_JSON_PATH):
+    """
+    Tries the spec links recorded by extract_html. Returns None if none of them is a spec.
+    """
+    if not os.path.exists(raw_path):
+        return None
+
+    if is_jsonl(raw_path):
+        links = next((r["spec_links"] for r in iter_jsonl(raw_path) if "spec_links" in r), [])
+    else:
+        with open(raw_path, "r") as f:
+            links = json.load(f).get("spec_links", [])
+
+    for link in links:
+        endpoints = import_openapi(link, out_path)
+        if endpoints is not None:
+            return endpoints
+    return None
+
+# ---------------- Export ----------------
+
+OPENAPI_TYPES = {"int": "integer", "float": "number", "double": "number", "bool": "boolean",
+                 "dict": "object", "list": "array"}
+
+def openapi_schema(value):
+    if isinstance(value, dict):
+        return {"type": "object", "properties": {k: openapi_schema(v) for k, v in value.items()}}
+    if isinstance(value, list):
+        return {"type": "array", "items": openapi_schema(value[0]) if value else {}}
+    t = str(value).strip().lower()
+    t = OPENAPI_TYPES.get(t, t)
+    if t == "array":
+        return {"type": "array", "items": {}}
+    if t not in ("string", "integer", "number", "boolean", "object"):
+        t = "string"
+    return {"type": t}
+
+def endpoint_to_operation(ep):
+    path_names = PATH_PARAM_PATTERN.findall(ep.get("path", ""))
+    parameters = [
+        {"name": name, "in": "path", "required": True, "schema": {"type": "string"}}
+        for name in dict.fromkeys(path_names)
+    ]
+    for p in ep.get("parameters", []):
+        if p.get("in", "query") != "query" or p["name"] in path_names:
+            continue
+        parameters.append({
+            "name": p["name"],
+            "in": "query",
+            "required": bool(p.get("required", False)),
+            "schema": openapi_schema(p.get("type", "string"))
+        })
+    for header in ep.get("headers", []):
+        parameters.append({"name": header, "in": "header", "required": False, "schema": {"type": "string"}})
+
+    operation = {
+        "summary": ep.get("name", ""),
+        "description": ep.get("description", ""),
+        "parameters": parameters,
+        "responses": {"default": {"description": "Response"}}
+    }
+    if ep.get("request_body"):
+        operation["requestBody"] = {
+            "content": {"application/json": {"schema": openapi_schema(ep["request_body"])}}
+        }
+    return operation
+
+def export_openapi(in_path=OUTPUT_JSON_PATH, out_path=OPENAPI_OUTPUT_PATH, title="Extracted API"):
+    """
+    Writes extracted_endpoints.json as an OpenAPI 3 document.
+    """
+    if not os.path.exists(in_path):
+        print(f"[ERROR] Extracted endpoints file not found: {in_path}")
+        return None
+
+    with open(in_path, "r") as f:
+        endpoints = json.load(f)
+
+    paths = {}
+    for ep in endpoints:
+        method = ep.get("method", "GET").lower()
+        if method not in HTTP_METHODS:
+            continue
+        path = PATH_PARAM_PATTERN.sub(r"{\1}", ep.get("path", "")) or "/"
+        paths.setdefault(path, {})[method] = endpoint_to_operation(ep)
+
+    spec = {
+        "openapi": "3.0.3",
+        "info": {"title": title, "version": "1.0.0"},
+        "paths": paths
+    }
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(spec, f, indent=2)
+
+    print(f"OpenAPI spec saved to: {out_path}")
+    return spec
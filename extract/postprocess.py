@@ -2,20 +2,32 @@
 
 import json
 import os
-from .llm_utils import deduplicate_endpoints
+import re
+from contextlib import ExitStack
+from dataclasses import dataclass
+from .metrics import instrument_stage, annotate
+from .streaming import open_text, iter_sections, json_array_writer
+from .provenance import chunk_lookup, build_provenance
 
 RAW_INPUT_PATH = "output/llm_output.txt"
 OUTPUT_JSON_PATH = "output/extracted_endpoints.json"
+CLEANED_INPUT_PATH = "output/cleaned_input.json"
+CHUNK_MARKER = "# --- Chunk"
+CHUNK_INDEX_PATTERN = re.compile(r"\s*(\d+)")
 
-def extract_all_endpoint_blocks(text):
+def section_index(section):
     """
-    Extracts all JSON blocks that contain an 'endpoints' key.
-    Handles multiple chunks in a raw LLM output file.
+    1-based chunk number from a section's "# --- Chunk N ---" header, or None.
     """
-    endpoints = []
-    chunks = text.split("# --- Chunk")
+    match = CHUNK_INDEX_PATTERN.match(section)
+    return int(match.group(1)) if match else None
 
-    for chunk in chunks:
+def iter_endpoint_blocks(sections):
+    """
+    Yields (chunk_index, endpoints) from every section that holds a JSON object
+    with an 'endpoints' key. Sections that fail to parse are skipped.
+    """
+    for chunk in sections:
         if "{" not in chunk:
             continue
         try:
@@ -23,55 +35,133 @@ def extract_all_endpoint_blocks(text):
             candidate = chunk[json_start:]
             data = json.loads(candidate)
             if isinstance(data, dict) and "endpoints" in data:
-                endpoints.extend(data["endpoints"])
+                yield section_index(chunk), data["endpoints"]
         except Exception:
             continue
 
+def extract_all_endpoint_blocks(text):
+    """
+    Extracts all JSON blocks that contain an 'endpoints' key.
+    Handles multiple chunks in a raw LLM output file.
+    """
+    endpoints = []
+    for _, block in iter_endpoint_blocks(text.split(CHUNK_MARKER)):
+        endpoints.extend(block)
     return endpoints
 
+@dataclass
+class Parameter:
+    __slots__ = ("name", "type", "required", "location")
+    name: str
+    type: str
+    required: bool
+    location: str
+
+@dataclass
+class EndpointRecord:
+    """
+    Compact normalized endpoint. Slots avoid a per-instance __dict__, which
+    matters when a large document yields many thousands of endpoints.
+    """
+    __slots__ = ("name", "method", "path", "description", "parameters", "request_body", "headers",
+                 "provenance")
+    name: str
+    method: str
+    path: str
+    description: str
+    parameters: tuple
+    request_body: dict
+    headers: tuple
+    provenance: dict
+
+    @classmethod
+    def from_raw(cls, ep):
+        description = ep.get("description", "").strip()
+        return cls(
+            name=description,
+            method=ep.get("method", "").strip().upper(),
+            path=ep.get("path", "").strip(),
+            description=description,
+            parameters=tuple(Parameter(p, "string", False, "query") for p in ep.get("parameters", [])),
+            request_body=ep.get("request_body", {}),
+            headers=tuple(ep.get("headers", [])),
+            provenance=None
+        )
+
+    @property
+    def key(self):
+        return self.method, self.path
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "method": self.method,
+            "path": self.path,
+            "description": self.description,
+            "parameters": [
+                {
+                    "name": p.name,
+                    "type": p.type,
+                    "required": p.required,
+                    "in": p.location
+                } for p in self.parameters
+            ],
+            "request_body": self.request_body,
+            "headers": list(self.headers)
+        }
+        if self.provenance is not None:
+            data["provenance"] = self.provenance
+        return data
+
 def normalize_endpoint(ep):
-    return {
-        "name": ep.get("description", "").strip(),
-        "method": ep.get("method", "").strip().upper(),
-        "path": ep.get("path", "").strip(),
-        "description": ep.get("description", "").strip(),
-        "parameters": [
-            {
-                "name": p,
-                "type": "string",
-                "required": False,
-                "in": "query"
-            } for p in ep.get("parameters", [])
-        ],
-        "request_body": ep.get("request_body", {}),
-        "headers": ep.get("headers", [])
-    }
-
-def parse_llm_output(raw_path=RAW_INPUT_PATH, out_path=OUTPUT_JSON_PATH):
+    return EndpointRecord.from_raw(ep).to_dict()
+
+@instrument_stage("parse_llm_output")
+def parse_llm_output(raw_path=RAW_INPUT_PATH, out_path=OUTPUT_JSON_PATH, cleaned_path=CLEANED_INPUT_PATH):
+    """
+    Merges the per-chunk LLM output into extracted_endpoints.json. Each endpoint
+    keeps provenance for the chunk it first appeared in; page and character span
+    are resolved against `cleaned_path` when that file is available.
+    """
     print(f"Parsing LLM output from: {raw_path}")
 
     if not os.path.exists(raw_path):
         print("LLM output file missing.")
         return
 
-    with open(raw_path, "r") as f:
-        raw_text = f.read()
+    raw_count = 0
+    seen = set()
 
-    raw_endpoints = extract_all_endpoint_blocks(raw_text)
-    print(f"Found {len(raw_endpoints)} raw endpoints across all chunks")
+    # Sections are parsed and written one at a time; large files are memory-mapped,
+    # so only the dedup keys grow with the size of the document.
+    lookup = chunk_lookup(cleaned_path)
 
-    if not raw_endpoints:
-        print("No valid endpoint data found.")
-        return
+    with open_text(raw_path) as buffer, ExitStack() as stack:
+        write = None
+        for index, block in iter_endpoint_blocks(iter_sections(buffer, CHUNK_MARKER)):
+            chunk, meta = lookup(index)
+            for ep in block:
+                if not isinstance(ep, dict):
+                    continue
+                raw_count += 1
+                record = EndpointRecord.from_raw(ep)
+                if record.key in seen:
+                    continue
+                seen.add(record.key)
+                record.provenance = build_provenance(index, chunk, meta, record.path)
+                if write is None:
+                    # Opened lazily so no output file is written when nothing parses.
+                    write = stack.enter_context(json_array_writer(out_path))
+                write(record.to_dict())
 
-    cleaned = [normalize_endpoint(ep) for ep in raw_endpoints]
-    cleaned = deduplicate_endpoints(cleaned)
+    print(f"Found {raw_count} raw endpoints across all chunks")
+    annotate(raw_endpoints=raw_count, endpoints=len(seen))
 
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "w") as f:
-        json.dump(cleaned, f, indent=2)
+    if not seen:
+        print("No valid endpoint data found.")
+        return
 
-    print(f"Parsed {len(cleaned)} endpoints")
+    print(f"Parsed {len(seen)} endpoints")
     print(f"Saved to: {out_path}")
 
 if __name__ == "__main__":
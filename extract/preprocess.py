@@ -2,57 +2,136 @@
 
 import json
 import os
+from .metrics import instrument_stage, record_error, annotate, inc, observe
+from .streaming import is_jsonl, iter_jsonl, jsonl_writer, JsonlSequence
 
-def preprocess_document(json_path, chunk_size=12000, output_path="output/cleaned_input.json"):
-    if not os.path.exists(json_path):
-        print(f"[ERROR] JSON file not found: {json_path}")
-        return []
-
-    with open(json_path, "r") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError as e:
-            print(f"[ERROR] Failed to parse JSON: {e}")
-            return []
-
-    content = data.get("content", [])
-    tables = data.get("tables", [])
-    blocks = []
-
-    # Collect textual content blocks
-    for item in content:
+def filter_content(content):
+    # Collect textual content blocks as (text, page); page is None for HTML.
+    for item, page in content:
         text = item.strip()
         if len(text) > 10 and not text.lower().startswith("copyright"):
-            blocks.append(text)
+            yield text, page
 
+def filter_tables(tables):
     # Extract readable rows from tables
     for table in tables:
-        headers = table.get("headers", [])
-        rows = table.get("rows", [])
-        for row in rows:
+        for row in table.get("rows", []):
             row_text = " | ".join(row).strip()
             if row_text and not row_text.lower().startswith("example"):
-                blocks.append(row_text)
+                yield row_text, None
+
+def load_blocks(json_path):
+    """
+    Returns (source, blocks) where blocks yields filtered (text, page) pairs in
+    document order: all content first, then table rows. JSON Lines input is
+    read in two streaming passes instead of being loaded whole.
+    """
+    if is_jsonl(json_path):
+        first = next(iter_jsonl(json_path), {})
+
+        def blocks():
+            yield from filter_content(
+                (r["content"], r.get("page")) for r in iter_jsonl(json_path) if "content" in r
+            )
+            yield from filter_tables(r["table"] for r in iter_jsonl(json_path) if "table" in r)
+
+        return first.get("source"), blocks()
+
+    with open(json_path, "r") as f:
+        data = json.load(f)
+
+    content = data.get("content", [])
+    pages = data.get("pages") or [None] * len(content)
+
+    def blocks():
+        yield from filter_content(zip(content, pages))
+        yield from filter_tables(data.get("tables", []))
 
-    print(f"Filtered {len(blocks)} blocks from documentation")
+    return data.get("source"), blocks()
 
-    # Chunking
-    chunks = []
+def iter_chunks(blocks, chunk_size):
+    """
+    Yields (chunk, block_pages) where block_pages lists [offset, page] for each
+    block in the chunk, so a character position can be mapped back to a page.
+    The list is empty when the source has no page numbers.
+    """
     current_chunk = ""
+    current_pages = []
 
-    for block in blocks:
-        if len(current_chunk) + len(block) + 1 <= chunk_size:
-            current_chunk += block + "\n"
-        else:
-            chunks.append(current_chunk.strip())
-            current_chunk = block + "\n"
+    for block, page in blocks:
+        if len(current_chunk) + len(block) + 1 > chunk_size and current_chunk:
+            yield current_chunk.strip(), current_pages
+            current_chunk = ""
+            current_pages = []
+        if page is not None:
+            current_pages.append([len(current_chunk), page])
+        current_chunk += block + "\n"
 
     if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+        yield current_chunk.strip(), current_pages
+
+@instrument_stage("preprocess_document")
+def preprocess_document(json_path, chunk_size=12000, output_path="output/cleaned_input.json"):
+    if not os.path.exists(json_path):
+        print(f"[ERROR] JSON file not found: {json_path}")
+        return []
+
+    block_count = 0
+
+    def counted(blocks):
+        nonlocal block_count
+        for block in blocks:
+            block_count += 1
+            yield block
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump({"chunks": chunks}, f, indent=2)
+    try:
+        source, blocks = load_blocks(json_path)
+
+        if is_jsonl(output_path):
+            # Chunks are written as they are formed; only the current chunk is in memory.
+            count = 0
+            with jsonl_writer(output_path) as write:
+                for chunk, pages in iter_chunks(counted(blocks), chunk_size):
+                    observe("projectz_chunk_chars", len(chunk))
+                    write({"chunk": chunk, "meta": {"source": source, "pages": pages}})
+                    count += 1
+            chunks = JsonlSequence(output_path, count, key="chunk")
+        else:
+            chunks = []
+            chunk_meta = []
+            for chunk, pages in iter_chunks(counted(blocks), chunk_size):
+                observe("projectz_chunk_chars", len(chunk))
+                chunks.append(chunk)
+                chunk_meta.append({"source": source, "pages": pages})
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, "w") as f:
+                json.dump({"chunks": chunks, "chunk_meta": chunk_meta}, f, indent=2)
+    except json.JSONDecodeError as e:
+        print(f"[ERROR] Failed to parse JSON: {e}")
+        record_error("preprocess_document", e)
+        return []
+
+    print(f"Filtered {block_count} blocks from documentation")
+
+    inc("projectz_chunks_total", len(chunks))
+    annotate(blocks=block_count, chunks=len(chunks))
 
     print(f"Saved {len(chunks)} cleaned chunks to: {output_path}")
     return chunks
+
+def iter_cleaned(cleaned_path):
+    """
+    Yields (chunk, meta) from a cleaned file in either format. meta is {} for
+    files written before chunk metadata was recorded.
+    """
+    if is_jsonl(cleaned_path):
+        for record in iter_jsonl(cleaned_path):
+            yield record["chunk"], record.get("meta", {})
+        return
+
+    with open(cleaned_path, "r") as f:
+        data = json.load(f)
+
+    chunks = data.get("chunks", [])
+    meta = data.get("chunk_meta") or [{}] * len(chunks)
+    yield from zip(chunks, meta)
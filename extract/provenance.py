@@ -0,0 +1,71 @@
+# extract/provenance.py
+
+import os
+from .preprocess import iter_cleaned
+
+def chunk_lookup(cleaned_path):
+    """
+    Returns lookup(index) -> (chunk, meta) for 1-based chunk numbers.
+    LLM output sections arrive in chunk order, so the cleaned file is walked
+    forward in lockstep and never loaded whole; an out-of-order request
+    restarts the walk.
+    """
+    state = {"iter": None, "pos": 0, "current": (None, {})}
+
+    def lookup(index):
+        if not cleaned_path or not index or not os.path.exists(cleaned_path):
+            return None, {}
+        if state["iter"] is None or index < state["pos"]:
+            state.update(iter=iter_cleaned(cleaned_path), pos=0, current=(None, {}))
+        while state["pos"] < index:
+            state["current"] = next(state["iter"], (None, {}))
+            state["pos"] += 1
+        return state["current"]
+
+    return lookup
+
+def find_span(chunk, path):
+    """
+    Character span of the endpoint's path in its chunk. Falls back to the
+    longest literal path segment when the exact path is not present.
+    """
+    if not chunk or not path:
+        return None
+
+    start = chunk.find(path)
+    if start != -1:
+        return [start, start + len(path)]
+
+    segments = [s for s in path.split("/") if len(s) > 2 and not s.startswith(("{", "<", ":"))]
+    for segment in sorted(segments, key=len, reverse=True):
+        start = chunk.find(segment)
+        if start != -1:
+            return [start, start + len(segment)]
+    return None
+
+def page_at(block_pages, offset):
+    page = None
+    for block_offset, block_page in block_pages:
+        if block_offset > offset:
+            break
+        page = block_page
+    return page
+
+def build_provenance(index, chunk, meta, path):
+    """
+    Provenance for one endpoint: 1-based chunk number (matching the
+    "# --- Chunk N ---" markers), source URL or file, page (PDF only) and the
+    character span of the path within the chunk.
+    """
+    block_pages = meta.get("pages") or []
+    span = find_span(chunk, path)
+    page = page_at(block_pages, span[0]) if span and block_pages else None
+    pages = [block_pages[0][1], block_pages[-1][1]] if block_pages else None
+
+    return {
+        "chunk": index,
+        "source": meta.get("source"),
+        "page": page,
+        "pages": pages,
+        "span": span
+    }
@@ -0,0 +1,123 @@
+# extract/streaming.py
+
+import json
+import mmap
+import os
+from contextlib import contextmanager
+
+# Files at least this large are memory-mapped instead of read into a string.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+
+LOW_MEMORY = os.getenv("PROJECTZ_LOW_MEMORY", "").lower() in ("1", "true", "yes")
+
+
+def is_jsonl(path):
+    return path.lower().endswith(".jsonl")
+
+def intermediate_paths(output_dir="output", low_memory=LOW_MEMORY):
+    """
+    Raw and cleaned intermediate paths. Low-memory mode uses JSON Lines so every
+    stage can stream records instead of loading the whole document.
+    """
+    ext = ".jsonl" if low_memory else ".json"
+    return os.path.join(output_dir, "raw_input" + ext), os.path.join(output_dir, "cleaned_input" + ext)
+
+@contextmanager
+def atomic_open(path):
+    """
+    Opens `path + ".tmp"` for writing and moves it over `path` only when the
+    block exits cleanly, so a failure midway never leaves a truncated file
+    that later stages would take for a finished one.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            yield f
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+@contextmanager
+def jsonl_writer(path):
+    """
+    Yields a write(record) function that appends one JSON object per line.
+    The file appears at `path` only once every record has been written.
+    """
+    with atomic_open(path) as f:
+        yield lambda record: f.write(json.dumps(record) + "\n")
+
+def iter_jsonl(path):
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class JsonlSequence:
+    """
+    Read-only view of a JSON Lines file: len() is known up front and iteration
+    re-reads the file, so callers can treat it like the list it replaces.
+    """
+
+    def __init__(self, path, count, key=None):
+        self.path = path
+        self.count = count
+        self.key = key
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for record in iter_jsonl(self.path):
+            yield record[self.key] if self.key else record
+
+@contextmanager
+def json_array_writer(path):
+    """
+    Streams items into a JSON array file, formatted exactly like
+    json.dump(items, f, indent=2), without holding the list in memory.
+    """
+    with atomic_open(path) as f:
+        count = 0
+
+        def write(item):
+            nonlocal count
+            body = json.dumps(item, indent=2).replace("\n", "\n  ")
+            f.write(("[\n  " if count == 0 else ",\n  ") + body)
+            count += 1
+
+        yield write
+        f.write("\n]" if count else "[]")
+
+@contextmanager
+def open_text(path):
+    """
+    Yields the file contents as a str, or as a read-only mmap (bytes-like)
+    when the file is larger than MMAP_THRESHOLD.
+    """
+    size = os.path.getsize(path)
+    if size < MMAP_THRESHOLD:
+        with open(path, "r") as f:
+            yield f.read()
+        return
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
+
+def iter_sections(buffer, marker):
+    """
+    Splits a str or mmap on `marker` without copying the whole buffer,
+    yielding each section as a str (same pieces as str.split(marker)).
+    """
+    is_bytes = not isinstance(buffer, str)
+    needle = marker.encode("utf-8") if is_bytes else marker
+    start = 0
+    while True:
+        end = buffer.find(needle, start)
+        piece = buffer[start:] if end == -1 else buffer[start:end]
+        yield piece.decode("utf-8", errors="replace") if is_bytes else piece
+        if end == -1:
+            return
+        start = end + len(needle)
@@ -1,171 +1,152 @@
 import os
 import json
 import re
+import hashlib
 
-SELECTED_FILE = "output/selected_apis.json"
-OUTPUT_FILE = "output/generated_code.go"
-
-IMPORTS = '''package main
-
-import (
-    "bytes"
-    "encoding/json"
-    "fmt"
-    "net/http"
-)
-'''
-
-BASE_URL = "https://api.example.com"
-
-# ---------------- Templates ----------------
-
-GET_TEMPLATE = '''func {{FUNC_NAME}}({{PARAMS}}) (*http.Response, error) {
-    baseURL := "{{BASE_URL}}{{PATH}}"
-    reqURL := fmt.Sprintf("%s?{{QUERY_STRING}}", baseURL{{ARGS}})
-    req, err := http.NewRequest("{{METHOD}}", reqURL, nil)
-    if err != nil {
-        return nil, err
-    }
-
-    {{HEADERS}}
-
-    client := &http.Client{}
-    resp, err := client.Do(req)
-    if err != nil {
-        return nil, err
-    }
-
-    defer resp.Body.Close()
-    return resp, nil
-}'''
-
-POST_LIKE_TEMPLATE = '''func {{FUNC_NAME}}({{PARAMS}}) (*http.Response, error) {
-    url := fmt.Sprintf("{{BASE_URL}}{{PATH}}"{{ARGS}})
-    payload := map[string]interface{}{
-        {{BODY_KV_PAIRS}}
-    }
-
-    jsonData, err := json.Marshal(payload)
-    if err != nil {
-        return nil, err
-    }
-
-    req, err := http.NewRequest("{{METHOD}}", url, bytes.NewBuffer(jsonData))
-    if err != nil {
-        return nil, err
-    }
-
-    req.Header.Set("Content-Type", "application/json")
-    {{HEADERS}}
+from . import emit_go, emit_python, emit_typescript
+from .ir import load_ir, unsupported_endpoints
+from extract.metrics import instrument_stage, inc, annotate
 
-    client := &http.Client{}
-    resp, err := client.Do(req)
-    if err != nil {
-        return nil, err
-    }
-
-    defer resp.Body.Close()
-    return resp, nil
-}'''
-
-# ---------------- Helpers ----------------
-
-used_func_names = {}
-
-def pascal_case(name):
-    return ''.join(word.capitalize() for word in re.sub(r'[^a-zA-Z0-9]', ' ', name).split())
-
-def get_unique_func_name(base_name):
-    base = pascal_case(base_name)
-    count = used_func_names.get(base, 0)
-    used_func_names[base] = count + 1
-    return base if count == 0 else f"{base}{count+1}"
-
-def sanitize(name):
-    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
-
-def build_headers_code(headers):
-    if not headers:
-        return ""
-    return '\n    '.join([f'req.Header.Set("{h}", "<{h.lower()}-value>")' for h in headers])
-
-def extract_path_params(path):
-    return re.findall(r"[<{]([a-zA-Z0-9_]+)[>}]?", path)
-
-def replace_path_placeholders(path):
-    return re.sub(r"[<{]([a-zA-Z0-9_]+)[>}]?", "%s", path)
+SELECTED_FILE = "output/selected_apis.json"
+OUTPUT_FILE = emit_go.OUTPUT_FILE
+MANIFEST_FILE = "output/codegen_manifest.json"
+
+# Language name -> emitter. An emitter is any object exposing LANGUAGE, OUTPUT_FILE,
+# COMMENT, HEADER, TEMPLATE_TEXT and render(endpoint_ir) -> str.
+EMITTERS = {
+    emit_go.LANGUAGE: emit_go,
+    emit_python.LANGUAGE: emit_python,
+    emit_typescript.LANGUAGE: emit_typescript
+}
+
+def register_emitter(emitter):
+    EMITTERS[emitter.LANGUAGE] = emitter
+
+# ---------------- Incremental Output ----------------
+
+def template_fingerprint(emitter):
+    # Any change to an emitter's templates invalidates all of its cached regions.
+    return hashlib.sha256(emitter.TEMPLATE_TEXT.encode("utf-8")).hexdigest()
+
+def endpoint_hash(ep, fingerprint):
+    payload = json.dumps(ep, sort_keys=True) + fingerprint
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+def region_markers(emitter):
+    return f"{emitter.COMMENT} BEGIN ENDPOINT: ", f"{emitter.COMMENT} END ENDPOINT: "
+
+def read_regions(emitter):
+    """
+    Returns {key: code} for every endpoint region found in a previously generated file.
+    """
+    if not os.path.exists(emitter.OUTPUT_FILE):
+        return {}
+
+    with open(emitter.OUTPUT_FILE, "r") as f:
+        text = f.read()
+
+    begin, end = region_markers(emitter)
+    pattern = re.compile(
+        re.escape(begin) + r"(.+?)\n(.*?)\n" + re.escape(end) + r"\1\n",
+        re.DOTALL
+    )
+    return {m.group(1): m.group(2) for m in pattern.finditer(text)}
+
+def write_incremental(emitter, ir, previous):
+    """
+    Renders only endpoints whose hash differs from the previous manifest entry and
+    splices them between the cached regions. The output file is not rewritten when
+    its content would be unchanged. Returns the new manifest entry.
+    """
+    fingerprint = template_fingerprint(emitter)
+    cached = previous.get("endpoints", {}) if previous.get("template") == fingerprint else {}
+    regions = read_regions(emitter) if cached else {}
+    begin, end = region_markers(emitter)
+    entries = {}
+    parts = [emitter.HEADER]
+    rendered = 0
+
+    for ep in ir:
+        digest = endpoint_hash(ep, fingerprint)
+        hit = cached.get(ep["key"], {}).get("hash") == digest and ep["key"] in regions
+        if hit:
+            code = regions[ep["key"]]
+        else:
+            code = emitter.render(ep).rstrip("\n")
+            rendered += 1
+        inc("projectz_cache_requests_total", labels={
+            "cache": f"codegen_{emitter.LANGUAGE}",
+            "result": "hit" if hit else "miss"
+        })
+
+        entries[ep["key"]] = {"hash": digest, "func_name": ep["name"]}
+        parts.append(f"\n{begin}{ep['key']}\n{code}\n{end}{ep['key']}\n")
+
+    content = "".join(parts)
+
+    existing = None
+    if os.path.exists(emitter.OUTPUT_FILE):
+        with open(emitter.OUTPUT_FILE, "r") as f:
+            existing = f.read()
+
+    if content == existing:
+        print(f"No endpoint changes; {emitter.OUTPUT_FILE} left untouched")
+    else:
+        os.makedirs(os.path.dirname(emitter.OUTPUT_FILE), exist_ok=True)
+        with open(emitter.OUTPUT_FILE, "w") as f:
+            f.write(content)
+        print(f"Rendered {rendered}/{len(entries)} endpoint(s); code generated at: {emitter.OUTPUT_FILE}")
+
+    return {"template": fingerprint, "endpoints": entries}
 
 # ---------------- Codegen Logic ----------------
 
-def generate_get_or_delete_function(ep, method):
-    func_name = get_unique_func_name(ep.get("name", "CallApi"))
-    param_list = ep.get("parameters", [])
-    path_params = extract_path_params(ep.get("path", ""))
-    query_params = [p["name"] for p in param_list if p.get("in") == "query"]
-    all_param_names = path_params + query_params
-    args = ', '.join([sanitize(p) + ' string' for p in all_param_names])
-    fmt_args = ', ' + ', '.join([sanitize(p) for p in path_params]) if path_params else ''
-    query_string = '&'.join([f'{p}=%s' for p in query_params])
-    query_fmt_args = ', ' + ', '.join([sanitize(p) for p in query_params]) if query_params else ''
-    headers = build_headers_code(ep.get("headers", []))
-    final_args = fmt_args + query_fmt_args
-
-    code = GET_TEMPLATE \
-        .replace("{{FUNC_NAME}}", func_name) \
-        .replace("{{PARAMS}}", args) \
-        .replace("{{BASE_URL}}", BASE_URL) \
-        .replace("{{PATH}}", replace_path_placeholders(ep.get("path", ""))) \
-        .replace("{{QUERY_STRING}}", query_string) \
-        .replace("{{ARGS}}", final_args) \
-        .replace("{{HEADERS}}", headers) \
-        .replace("{{METHOD}}", method)
-    return code
-
-def generate_post_put_function(ep):
-    func_name = get_unique_func_name(ep.get("name", "CallApi"))
-    req_body = ep.get("request_body", {})
-    path_params = extract_path_params(ep.get("path", ""))
-    body_kv = ',\n        '.join([f'"{k}": {sanitize(k)}' for k in req_body.keys()])
-    args = ', '.join([f'{sanitize(k)} string' for k in list(path_params) + list(req_body.keys())])
-    fmt_args = ', ' + ', '.join([sanitize(p) for p in path_params]) if path_params else ''
-    headers = build_headers_code(ep.get("headers", []))
-
-    code = POST_LIKE_TEMPLATE \
-        .replace("{{FUNC_NAME}}", func_name) \
-        .replace("{{PARAMS}}", args) \
-        .replace("{{BODY_KV_PAIRS}}", body_kv) \
-        .replace("{{METHOD}}", ep.get("method", "POST").upper()) \
-        .replace("{{PATH}}", replace_path_placeholders(ep.get("path", ""))) \
-        .replace("{{BASE_URL}}", BASE_URL) \
-        .replace("{{HEADERS}}", headers) \
-        .replace("{{ARGS}}", fmt_args)
-    return code
+@instrument_stage("generate_code")
+def generate_code(languages=None, selected_path=SELECTED_FILE):
+    """
+    Builds the IR once from selected_apis.json and renders it with every requested
+    emitter (all registered emitters by default). Returns (endpoints, {language: output_file}).
+    """
+    languages = languages or list(EMITTERS)
+    unknown = [lang for lang in languages if lang not in EMITTERS]
+    if unknown:
+        raise ValueError(f"Unsupported language(s): {', '.join(unknown)}")
 
-def generate_go_code():
-    if not os.path.exists(SELECTED_FILE):
-        raise FileNotFoundError("selected_apis.json not found.")
-
-    with open(SELECTED_FILE, "r") as f:
-        endpoints = json.load(f)
+    endpoints, ir = load_ir(selected_path)
+    annotate(endpoints=len(ir), languages=languages)
 
-    if not endpoints:
-        raise ValueError("No endpoints found in selected_apis.json")
+    skipped = unsupported_endpoints(endpoints)
+    if skipped:
+        print(f"[WARN] Skipping {len(skipped)} endpoint(s) with unsupported methods: {', '.join(skipped)}")
 
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
+    manifest = load_manifest()
+    updated = dict(manifest)
+    outputs = {}
 
-    with open(OUTPUT_FILE, "w") as f:
-        f.write(IMPORTS + "\n")
+    for lang in languages:
+        emitter = EMITTERS[lang]
+        updated[lang] = write_incremental(emitter, ir, manifest.get(lang, {}))
+        outputs[lang] = emitter.OUTPUT_FILE
 
-        for ep in endpoints:
-            method = ep.get("method", "GET").upper()
-            if method in ["GET", "DELETE"]:
-                code = generate_get_or_delete_function(ep, method)
-            elif method in ["POST", "PUT"]:
-                code = generate_post_put_function(ep)
-            else:
-                continue
+    if updated != manifest:
+        save_manifest(updated)
 
-            f.write("\n" + code + "\n")
+    return endpoints, outputs
 
-    print(f"Code generated at: {OUTPUT_FILE}")
+def generate_go_code():
+    endpoints, _ = generate_code([emit_go.LANGUAGE])
     return endpoints
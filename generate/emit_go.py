@@ -0,0 +1,210 @@
+# generate/emit_go.py
+
+from .ir import BODY_METHODS, escape_idents
+
+LANGUAGE = "go"
+OUTPUT_FILE = "output/generated_code.go"
+COMMENT = "//"
+
+BASE_URL = "https://api.example.com"
+
+HEADER = '''package main
+
+import (
+    "bytes"
+    "encoding/json"
+    "fmt"
+    "net/http"
+    "net/url"
+)
+
+// Keep every import used even when no POST/PUT/PATCH endpoints are selected.
+var _ = bytes.NewBuffer
+
+// addQuery encodes one query value; arrays repeat the key, objects are sent as JSON.
+func addQuery(query url.Values, key string, value interface{}) {
+    switch v := value.(type) {
+    case string:
+        query.Add(key, v)
+    case []interface{}:
+        for _, item := range v {
+            addQuery(query, key, item)
+        }
+    case map[string]interface{}:
+        encoded, _ := json.Marshal(v)
+        query.Add(key, string(encoded))
+    default:
+        query.Add(key, fmt.Sprint(v))
+    }
+}
+'''
+
+TYPES = {
+    "string": "string",
+    "integer": "int",
+    "number": "float64",
+    "boolean": "bool",
+    "object": "map[string]interface{}",
+    "array": "[]interface{}"
+}
+
+# Optional parameters of these types are pointers so "not set" differs from the zero value.
+SCALAR_TYPES = {"string", "integer", "number", "boolean"}
+
+RESERVED = {
+    "break", "case", "chan", "const", "continue", "default", "defer", "else",
+    "fallthrough", "for", "func", "go", "goto", "if", "import", "interface",
+    "map", "package", "range", "return", "select", "struct", "switch", "type", "var",
+    # predeclared identifiers; a parameter named "string" would shadow its own type
+    "any", "bool", "byte", "comparable", "complex64", "complex128", "error",
+    "float32", "float64", "int", "int8", "int16", "int32", "int64", "rune",
+    "string", "uint", "uint8", "uint16", "uint32", "uint64", "uintptr",
+    "true", "false", "iota", "nil",
+    "append", "cap", "clear", "close", "complex", "copy", "delete", "imag", "len",
+    "make", "max", "min", "new", "panic", "print", "println", "real", "recover",
+    # imported packages
+    "bytes", "json", "fmt", "http", "url",
+    # identifiers already used inside the templates
+    "reqURL", "req", "err", "client", "resp", "query", "payload", "jsonData", "addQuery"
+}
+
+# ---------------- Templates ----------------
+
+GET_TEMPLATE = '''func {{FUNC_NAME}}({{PARAMS}}) (*http.Response, error) {
+    reqURL := fmt.Sprintf("{{BASE_URL}}{{PATH}}"{{ARGS}})
+    query := url.Values{}
+    {{QUERY}}
+    if len(query) > 0 {
+        reqURL += "?" + query.Encode()
+    }
+
+    req, err := http.NewRequest("{{METHOD}}", reqURL, nil)
+    if err != nil {
+        return nil, err
+    }
+
+    {{HEADERS}}
+
+    client := &http.Client{}
+    resp, err := client.Do(req)
+    if err != nil {
+        return nil, err
+    }
+
+    defer resp.Body.Close()
+    return resp, nil
+}'''
+
+POST_LIKE_TEMPLATE = '''func {{FUNC_NAME}}({{PARAMS}}) (*http.Response, error) {
+    reqURL := fmt.Sprintf("{{BASE_URL}}{{PATH}}"{{ARGS}})
+    query := url.Values{}
+    {{QUERY}}
+    if len(query) > 0 {
+        reqURL += "?" + query.Encode()
+    }
+
+    payload := map[string]interface{}{
+        {{BODY_KV_PAIRS}}
+    }
+
+    jsonData, err := json.Marshal(payload)
+    if err != nil {
+        return nil, err
+    }
+
+    req, err := http.NewRequest("{{METHOD}}", reqURL, bytes.NewBuffer(jsonData))
+    if err != nil {
+        return nil, err
+    }
+
+    req.Header.Set("Content-Type", "application/json")
+    {{HEADERS}}
+
+    client := &http.Client{}
+    resp, err := client.Do(req)
+    if err != nil {
+        return nil, err
+    }
+
+    defer resp.Body.Close()
+    return resp, nil
+}'''
+
+TEMPLATE_TEXT = HEADER + GET_TEMPLATE + POST_LIKE_TEMPLATE + BASE_URL
+
+# ---------------- Helpers ----------------
+
+def build_headers_code(headers):
+    if not headers:
+        return ""
+    return '\n    '.join([f'req.Header.Set("{h}", "<{h.lower()}-value>")' for h in headers])
+
+def is_pointer(p):
+    return not p["required"] and p["type"] in SCALAR_TYPES
+
+def go_type(p):
+    return ("*" if is_pointer(p) else "") + TYPES[p["type"]]
+
+def signature_params(ep):
+    """
+    Parameters in the order the generated Go function takes them: path, query,
+    then body fields for methods that send a body.
+    """
+    params = ep["path_params"] + ep["query_params"]
+    if ep["method"] in BODY_METHODS:
+        params = params + ep["body_params"]
+    return params
+
+def build_params(ep):
+    return ', '.join(f'{p["ident"]} {go_type(p)}' for p in signature_params(ep))
+
+def build_path(ep):
+    return ''.join(text.replace("%", "%%") if kind == "literal" else "%s" for kind, text in ep["path_parts"])
+
+def build_path_args(ep):
+    names = {p["ident"] for p in ep["path_params"]}
+    args = [f'url.PathEscape({text})' for kind, text in ep["path_parts"] if kind == "param" and text in names]
+    return ', ' + ', '.join(args) if args else ''
+
+def build_query_code(ep):
+    lines = []
+    for p in ep["query_params"]:
+        if p["required"]:
+            lines.append(f'addQuery(query, "{p["name"]}", {p["ident"]})')
+        else:
+            value = "*" + p["ident"] if is_pointer(p) else p["ident"]
+            lines.append(f'if {p["ident"]} != nil {{\n        addQuery(query, "{p["name"]}", {value})\n    }}')
+    return '\n    '.join(lines)
+
+# ---------------- Rendering ----------------
+
+def render_get_or_delete(ep):
+    return GET_TEMPLATE \
+        .replace("{{FUNC_NAME}}", ep["name"]) \
+        .replace("{{PARAMS}}", build_params(ep)) \
+        .replace("{{BASE_URL}}", BASE_URL) \
+        .replace("{{PATH}}", build_path(ep)) \
+        .replace("{{ARGS}}", build_path_args(ep)) \
+        .replace("{{QUERY}}", build_query_code(ep)) \
+        .replace("{{HEADERS}}", build_headers_code(ep["headers"])) \
+        .replace("{{METHOD}}", ep["method"])
+
+def render_post_put(ep):
+    body_kv = '\n        '.join([f'"{p["name"]}": {p["ident"]},' for p in ep["body_params"]])
+
+    return POST_LIKE_TEMPLATE \
+        .replace("{{FUNC_NAME}}", ep["name"]) \
+        .replace("{{PARAMS}}", build_params(ep)) \
+        .replace("{{QUERY}}", build_query_code(ep)) \
+        .replace("{{BODY_KV_PAIRS}}", body_kv) \
+        .replace("{{METHOD}}", ep["method"]) \
+        .replace("{{PATH}}", build_path(ep)) \
+        .replace("{{BASE_URL}}", BASE_URL) \
+        .replace("{{HEADERS}}", build_headers_code(ep["headers"])) \
+        .replace("{{ARGS}}", build_path_args(ep))
+
+def render(ep):
+    ep = escape_idents(ep, RESERVED)
+    if ep["method"] not in BODY_METHODS:
+        return render_get_or_delete(ep)
+    return render_post_put(ep)
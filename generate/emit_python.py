@@ -0,0 +1,109 @@
+# generate/emit_python.py
+
+import keyword
+
+from .ir import snake_case, escape_idents, BODY_METHODS
+
+LANGUAGE = "python"
+OUTPUT_FILE = "output/generated_client.py"
+COMMENT = "#"
+
+BASE_URL = "https://api.example.com"
+
+HEADER = f'''# Generated API client. Do not edit by hand.
+
+from typing import Any, Optional
+from urllib.parse import quote
+
+import requests
+
+BASE_URL = "{BASE_URL}"
+
+# One pooled session is shared by every call so connections are reused.
+session = requests.Session()
+
+
+def _drop_none(values):
+    return {{k: v for k, v in values.items() if v is not None}}
+'''
+
+TYPES = {
+    "string": "str",
+    "integer": "int",
+    "number": "float",
+    "boolean": "bool",
+    "object": "dict",
+    "array": "list"
+}
+
+RESERVED = set(keyword.kwlist) | {
+    "headers", "default_headers", "session", "url", "params", "body",
+    "requests", "quote", "str", "Any", "Optional", "BASE_URL", "_drop_none"
+}
+
+TEMPLATE = '''def {{FUNC_NAME}}({{PARAMS}}) -> requests.Response:
+    """{{METHOD}} {{PATH}}{{DOC}}"""
+    url = f"{BASE_URL}{{URL_PATH}}"
+    params = _drop_none({{QUERY}})
+    body = {{BODY}}
+    default_headers = {{HEADERS}}
+    default_headers.update(headers or {})
+    return session.request("{{METHOD}}", url, params=params, json=body, headers=default_headers)
+'''
+
+TEMPLATE_TEXT = HEADER + TEMPLATE
+
+# ---------------- Helpers ----------------
+
+def func_name(ep):
+    name = snake_case(ep["name"])
+    return name + "_" if name in RESERVED else name
+
+def build_signature(ep):
+    params = ep["path_params"] + ep["query_params"] + ep["body_params"]
+    required = [p for p in params if p["required"]]
+    optional = [p for p in params if not p["required"]]
+    args = [f'{p["ident"]}: {TYPES[p["type"]]}' for p in required]
+    args += [f'{p["ident"]}: Optional[{TYPES[p["type"]]}] = None' for p in optional]
+    args.append("headers: Optional[dict] = None")
+    if len(args) == 1:
+        return "*, " + args[0]
+    return ", ".join(args[:-1]) + ", *, " + args[-1]
+
+def build_url_path(ep):
+    out = []
+    for kind, text in ep["path_parts"]:
+        if kind == "literal":
+            text = text.replace("\\", "\\\\").replace('"', '\\"')
+            out.append(text.replace("{", "{{").replace("}", "}}"))
+        else:
+            out.append("{quote(str(" + text + "), safe='')}")
+    return "".join(out)
+
+def build_dict(params):
+    if not params:
+        return "{}"
+    return "{" + ", ".join(f'{p["name"]!r}: {p["ident"]}' for p in params) + "}"
+
+def docstring_text(text):
+    # Backslashes and quotes from LLM-written descriptions must not end or break the docstring.
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+# ---------------- Rendering ----------------
+
+def render(ep):
+    ep = escape_idents(ep, RESERVED)
+    body = build_dict(ep["body_params"]) if ep["method"] in BODY_METHODS else "None"
+    headers = "{" + ", ".join(f'{h!r}: {"<" + h.lower() + "-value>"!r}' for h in ep["headers"]) + "}"
+    doc = f'\n\n    {ep["description"]}\n    ' if ep["description"] else ""
+
+    return TEMPLATE \
+        .replace("{{FUNC_NAME}}", func_name(ep)) \
+        .replace("{{PARAMS}}", build_signature(ep)) \
+        .replace("{{METHOD}}", ep["method"]) \
+        .replace("{{PATH}}", docstring_text(ep["path"])) \
+        .replace("{{DOC}}", docstring_text(doc)) \
+        .replace("{{URL_PATH}}", build_url_path(ep)) \
+        .replace("{{QUERY}}", build_dict(ep["query_params"])) \
+        .replace("{{BODY}}", body) \
+        .replace("{{HEADERS}}", headers)
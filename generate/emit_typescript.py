@@ -0,0 +1,113 @@
+# generate/emit_typescript.py
+
+import json
+
+from .ir import camel_case, escape_idents, BODY_METHODS
+
+LANGUAGE = "typescript"
+OUTPUT_FILE = "output/generated_client.ts"
+COMMENT = "//"
+
+BASE_URL = "https://api.example.com"
+
+HEADER = f'''// Generated API client. Do not edit by hand.
+
+export const BASE_URL = "{BASE_URL}";
+
+function withQuery(url: string, query: Record<string, unknown>): string {{
+  const search = new URLSearchParams();
+  for (const [key, value] of Object.entries(query)) {{
+    if (value !== undefined && value !== null) {{
+      search.append(key, String(value));
+    }}
+  }}
+  const qs = search.toString();
+  return qs ? `${{url}}?${{qs}}` : url;
+}}
+'''
+
+TYPES = {
+    "string": "string",
+    "integer": "number",
+    "number": "number",
+    "boolean": "boolean",
+    "object": "Record<string, unknown>",
+    "array": "unknown[]"
+}
+
+RESERVED = {
+    "break", "case", "catch", "class", "const", "continue", "debugger", "default",
+    "delete", "do", "else", "enum", "export", "extends", "false", "finally", "for",
+    "function", "if", "import", "in", "instanceof", "new", "null", "return", "super",
+    "switch", "this", "throw", "true", "try", "typeof", "var", "void", "while", "with",
+    "let", "static", "yield", "await", "implements", "interface", "package", "private",
+    "protected", "public",
+    # names used inside the templates
+    "headers", "url", "body", "fetch", "withQuery", "BASE_URL",
+    "String", "JSON", "encodeURIComponent"
+}
+
+TEMPLATE = '''/** {{METHOD}} {{PATH}}{{DOC}} */
+export async function {{FUNC_NAME}}({{PARAMS}}): Promise<Response> {
+  const url = withQuery(`${BASE_URL}{{URL_PATH}}`, {{QUERY}});
+  return fetch(url, {
+    method: "{{METHOD}}",
+    headers: { {{HEADERS}}...headers },{{BODY}}
+  });
+}
+'''
+
+TEMPLATE_TEXT = HEADER + TEMPLATE
+
+# ---------------- Helpers ----------------
+
+def func_name(ep):
+    name = camel_case(ep["name"])
+    return name + "_" if name in RESERVED else name
+
+def build_signature(ep):
+    params = ep["path_params"] + ep["query_params"] + ep["body_params"]
+    required = [p for p in params if p["required"]]
+    optional = [p for p in params if not p["required"]]
+    args = [f'{p["ident"]}: {TYPES[p["type"]]}' for p in required]
+    args += [f'{p["ident"]}?: {TYPES[p["type"]]}' for p in optional]
+    args.append("headers: Record<string, string> = {}")
+    return ", ".join(args)
+
+def build_url_path(ep):
+    out = []
+    for kind, text in ep["path_parts"]:
+        if kind == "literal":
+            out.append(text.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${"))
+        else:
+            out.append(f'${{encodeURIComponent(String({text}))}}')
+    return "".join(out)
+
+def build_object(params):
+    if not params:
+        return "{}"
+    return "{ " + ", ".join(f'{json.dumps(p["name"])}: {p["ident"]}' for p in params) + " }"
+
+# ---------------- Rendering ----------------
+
+def render(ep):
+    ep = escape_idents(ep, RESERVED)
+    headers = "".join(
+        f'{json.dumps(h)}: {json.dumps("<" + h.lower() + "-value>")}, ' for h in ep["headers"]
+    )
+    body = ""
+    if ep["method"] in BODY_METHODS:
+        headers = '"Content-Type": "application/json", ' + headers
+        body = f'\n    body: JSON.stringify({build_object(ep["body_params"])}),'
+    doc = f' - {ep["description"]}' if ep["description"] else ""
+
+    return TEMPLATE \
+        .replace("{{FUNC_NAME}}", func_name(ep)) \
+        .replace("{{PARAMS}}", build_signature(ep)) \
+        .replace("{{METHOD}}", ep["method"]) \
+        .replace("{{PATH}}", ep["path"].replace("*/", "*\\/")) \
+        .replace("{{DOC}}", doc.replace("*/", "*\\/")) \
+        .replace("{{URL_PATH}}", build_url_path(ep)) \
+        .replace("{{QUERY}}", build_object(ep["query_params"])) \
+        .replace("{{HEADERS}}", headers) \
+        .replace("{{BODY}}", body)
@@ -0,0 +1,206 @@
+# generate/ir.py
+
+import json
+import os
+import re
+
+SELECTED_FILE = "output/selected_apis.json"
+
+SUPPORTED_METHODS = ["GET", "DELETE", "POST", "PUT", "PATCH"]
+
+# Methods whose non-path parameters travel in a JSON body.
+BODY_METHODS = ["POST", "PUT", "PATCH"]
+
+PATH_PARAM_PATTERN = re.compile(r"[<{]([a-zA-Z0-9_]+)[>}]?")
+
+# ---------------- Naming ----------------
+
+def pascal_case(name):
+    return ''.join(word.capitalize() for word in re.sub(r'[^a-zA-Z0-9]', ' ', name).split())
+
+def snake_case(pascal):
+    return re.sub(r'(?<!^)(?=[A-Z])', '_', pascal).lower()
+
+def camel_case(pascal):
+    return pascal[:1].lower() + pascal[1:]
+
+def sanitize(name):
+    name = re.sub(r'[^a-zA-Z0-9_]', '_', name)
+    return "p_" + name if not name or name[0].isdigit() else name
+
+def escape_reserved(name, reserved):
+    return name + "_" if name in reserved else name
+
+def unique_name(base, used):
+    name = base
+    count = 1
+    while name in used:
+        count += 1
+        name = f"{base}{count}"
+    used[name] = 1
+    return name
+
+# ---------------- Types ----------------
+
+def normalize_type(value):
+    """
+    Maps the loose type hints found in extracted specs to a small neutral set:
+    string, integer, number, boolean, object, array.
+    """
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if not isinstance(value, str):
+        return "string"
+
+    t = value.strip().lower()
+    if t.endswith("[]") or t in ("array", "list"):
+        return "array"
+    if t in ("int", "integer", "long", "int32", "int64"):
+        return "integer"
+    if t in ("float", "double", "number", "decimal"):
+        return "number"
+    if t in ("bool", "boolean"):
+        return "boolean"
+    if t in ("object", "dict", "map", "json"):
+        return "object"
+    return "string"
+
+# ---------------- IR ----------------
+
+def endpoint_key(ep, seen):
+    """
+    Stable identifier for an endpoint, based on (method, path).
+    Repeated keys within one selection get a numeric suffix.
+    """
+    base = f'{ep.get("method", "GET").upper()} {ep.get("path", "")}'
+    base = re.sub(r"\s+", " ", base).strip()
+    count = seen.get(base, 0)
+    seen[base] = count + 1
+    return base if count == 0 else f"{base} #{count+1}"
+
+def build_path_parts(path, idents):
+    """
+    Splits a path into literal text and parameter references, e.g.
+    "/users/{id}/posts" -> [("literal", "/users/"), ("param", "id"), ("literal", "/posts")]
+    """
+    parts = []
+    pos = 0
+    for match in PATH_PARAM_PATTERN.finditer(path):
+        if match.start() > pos:
+            parts.append(("literal", path[pos:match.start()]))
+        parts.append(("param", idents[match.group(1)]))
+        pos = match.end()
+    if pos < len(path):
+        parts.append(("literal", path[pos:]))
+    return parts
+
+def build_endpoint_ir(ep, key, func_name):
+    path = ep.get("path", "")
+    used_idents = {}
+    path_idents = {}
+    params = []
+
+    for name in PATH_PARAM_PATTERN.findall(path):
+        if name in path_idents:
+            continue
+        ident = unique_name(sanitize(name), used_idents)
+        path_idents[name] = ident
+        params.append({"name": name, "ident": ident, "type": "string", "in": "path", "required": True})
+
+    for p in ep.get("parameters", []):
+        if isinstance(p, str):
+            p = {"name": p, "in": "query"}
+        if p.get("in", "query") != "query" or p.get("name") in path_idents:
+            continue
+        params.append({
+            "name": p["name"],
+            "ident": unique_name(sanitize(p["name"]), used_idents),
+            "type": normalize_type(p.get("type", "string")),
+            "in": "query",
+            "required": bool(p.get("required", False))
+        })
+
+    for name, field_type in (ep.get("request_body") or {}).items():
+        params.append({
+            "name": name,
+            "ident": unique_name(sanitize(name), used_idents),
+            "type": normalize_type(field_type),
+            "in": "body",
+            "required": True
+        })
+
+    return {
+        "key": key,
+        "name": func_name,
+        "method": ep.get("method", "GET").upper(),
+        "path": path,
+        "path_parts": build_path_parts(path, path_idents),
+        "description": ep.get("description", ""),
+        "path_params": [p for p in params if p["in"] == "path"],
+        "query_params": [p for p in params if p["in"] == "query"],
+        "body_params": [p for p in params if p["in"] == "body"],
+        "headers": list(ep.get("headers", []))
+    }
+
+def escape_idents(ep, reserved):
+    """
+    Copy of an endpoint IR for one target language: identifiers in `reserved`
+    get a "_" suffix and are then deduplicated, so "type" and "type_" stay
+    distinct. The shared IR itself stays language-neutral.
+    """
+    used = {}
+    renamed = {}
+    escaped = {}
+    for group in ("path_params", "query_params", "body_params"):
+        escaped[group] = []
+        for p in ep[group]:
+            renamed[p["ident"]] = unique_name(escape_reserved(p["ident"], reserved), used)
+            escaped[group].append(dict(p, ident=renamed[p["ident"]]))
+    path_parts = [(kind, renamed[text] if kind == "param" else text) for kind, text in ep["path_parts"]]
+    return dict(ep, path_parts=path_parts, **escaped)
+
+def build_ir(endpoints):
+    """
+    Builds the language-neutral representation shared by every emitter.
+    Endpoints with unsupported methods are dropped; see unsupported_endpoints().
+    """
+    used_func_names = {}
+    seen_keys = {}
+    ir = []
+
+    for ep in endpoints:
+        if ep.get("method", "GET").upper() not in SUPPORTED_METHODS:
+            continue
+        key = endpoint_key(ep, seen_keys)
+        base = pascal_case(ep.get("name", "")) or "CallApi"
+        if base[0].isdigit():
+            base = "Api" + base
+        func_name = unique_name(base, used_func_names)
+        ir.append(build_endpoint_ir(ep, key, func_name))
+
+    return ir
+
+def unsupported_endpoints(endpoints):
+    """
+    "METHOD path" for every endpoint build_ir() drops, e.g. HEAD or OPTIONS
+    operations imported from an OpenAPI spec.
+    """
+    return [
+        f'{ep.get("method", "GET").upper()} {ep.get("path", "")}'
+        for ep in endpoints
+        if ep.get("method", "GET").upper() not in SUPPORTED_METHODS
+    ]
+
+def load_ir(path=SELECTED_FILE):
+    if not os.path.exists(path):
+        raise FileNotFoundError("selected_apis.json not found.")
+
+    with open(path, "r") as f:
+        endpoints = json.load(f)
+
+    if not endpoints:
+        raise ValueError("No endpoints found in selected_apis.json")
+
+    return endpoints, build_ir(endpoints)
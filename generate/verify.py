@@ -0,0 +1,457 @@
+# generate/verify.py
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from . import emit_go
+from .ir import build_ir, load_ir, sanitize
+from extract.metrics import instrument_stage, annotate
+
+EXTRACTED_FILE = "output/extracted_endpoints.json"
+SELECTED_FILE = "output/selected_apis.json"
+REPORT_FILE = "output/contract_report.json"
+
+CALL_HEADER = "X-Contract-Call"
+
+# ---------------- Go Harness ----------------
+
+HARNESS_TEMPLATE = '''package main
+
+import (
+    "encoding/json"
+    "net/http"
+    "net/url"
+    "os"
+    "strconv"
+    "sync"
+    "time"
+)
+
+// Sent to the mock server during the contract phase so it knows which call to check.
+var contractCall string
+
+type rewriteTransport struct {
+    target *url.URL
+    base   http.RoundTripper
+}
+
+func (t *rewriteTransport) RoundTrip(req *http.Request) (*http.Response, error) {
+    r := req.Clone(req.Context())
+    r.URL.Scheme = t.target.Scheme
+    r.URL.Host = t.target.Host
+    r.Host = t.target.Host
+    if contractCall != "" {
+        r.Header.Set("{{CALL_HEADER}}", contractCall)
+    }
+    return t.base.RoundTrip(r)
+}
+
+type contractCase struct {
+    name string
+    fn   func() (*http.Response, error)
+}
+
+type callResult struct {
+    Name      string  `json:"name,omitempty"`
+    Phase     string  `json:"phase"`
+    Status    int     `json:"status,omitempty"`
+    Error     string  `json:"error,omitempty"`
+    LatencyMs float64 `json:"latency_ms"`
+}
+
+func ptr[T any](v T) *T {
+    return &v
+}
+
+var cases = []contractCase{
+{{CASES}}
+}
+
+func runCase(c contractCase, phase string) callResult {
+    start := time.Now()
+    resp, err := c.fn()
+    res := callResult{Name: c.name, Phase: phase, LatencyMs: float64(time.Since(start).Microseconds()) / 1000}
+    if err != nil {
+        res.Error = err.Error()
+    } else {
+        res.Status = resp.StatusCode
+    }
+    return res
+}
+
+func main() {
+    target, err := url.Parse(os.Args[1])
+    if err != nil {
+        panic(err)
+    }
+    concurrency, _ := strconv.Atoi(os.Args[2])
+    iterations, _ := strconv.Atoi(os.Args[3])
+    http.DefaultTransport = &rewriteTransport{target: target, base: http.DefaultTransport}
+    out := json.NewEncoder(os.Stdout)
+
+    // Contract phase: one call per endpoint, sequential, checked by the mock server.
+    for _, c := range cases {
+        contractCall = c.name
+        out.Encode(runCase(c, "contract"))
+    }
+    contractCall = ""
+
+    // Load phase: every endpoint `iterations` times across `concurrency` workers.
+    jobs := make(chan contractCase)
+    results := make(chan callResult)
+    var wg sync.WaitGroup
+    start := time.Now()
+    for w := 0; w < concurrency; w++ {
+        wg.Add(1)
+        go func() {
+            defer wg.Done()
+            for c := range jobs {
+                results <- runCase(c, "load")
+            }
+        }()
+    }
+    go func() {
+        for i := 0; i < iterations; i++ {
+            for _, c := range cases {
+                jobs <- c
+            }
+        }
+        close(jobs)
+    }()
+    go func() {
+        wg.Wait()
+        close(results)
+    }()
+    for r := range results {
+        out.Encode(r)
+    }
+    out.Encode(callResult{Phase: "summary", LatencyMs: float64(time.Since(start).Microseconds()) / 1000})
+}
+'''
+
+def sample_value(p):
+    """
+    Argument the harness passes for a parameter, typed like the parameter. Keyed
+    by the declared name, not the identifier, so spec and client agree even when
+    a name is escaped.
+    """
+    text = f"{sanitize(p['name'])}-sample"
+    return {
+        "integer": 7,
+        "number": 2.5,
+        "boolean": True,
+        "object": {"key": text},
+        "array": [text]
+    }.get(p["type"], text)
+
+def query_text(p):
+    # How the sample travels in a query string: one array item, objects as compact JSON.
+    value = sample_value(p)
+    if p["type"] == "array":
+        return value[0]
+    if p["type"] == "object":
+        return json.dumps(value, separators=(",", ":"))
+    if p["type"] == "boolean":
+        return "true"
+    return str(value)
+
+def go_literal(p):
+    value = sample_value(p)
+    if p["type"] == "object":
+        literal = f'map[string]interface{{}}{{"key": {json.dumps(value["key"])}}}'
+    elif p["type"] == "array":
+        literal = f'[]interface{{}}{{{json.dumps(value[0])}}}'
+    else:
+        literal = json.dumps(value)
+    return f"ptr({literal})" if emit_go.is_pointer(p) else literal
+
+def build_harness(ir):
+    cases = []
+    for ep in ir:
+        args = ", ".join(go_literal(p) for p in emit_go.signature_params(ep))
+        cases.append(
+            f'    {{name: "{ep["name"]}", fn: func() (*http.Response, error) {{ return {ep["name"]}({args}) }}}},'
+        )
+    return HARNESS_TEMPLATE \
+        .replace("{{CALL_HEADER}}", CALL_HEADER) \
+        .replace("{{CASES}}", "\n".join(cases))
+
+# ---------------- Expectations ----------------
+
+def expected_request(spec_ep):
+    """
+    The request a correct client sends for the sample arguments, derived from the
+    endpoint's declared parameters in the extracted spec (not from any emitter).
+    """
+    names = {p["ident"]: p for p in spec_ep["path_params"]}
+    path = "".join(
+        text if kind == "literal" else sample_value(names[text]) for kind, text in spec_ep["path_parts"]
+    )
+    return {
+        "method": spec_ep["method"],
+        "path": path,
+        "query": {p["name"]: query_text(p) for p in spec_ep["query_params"]},
+        "body": {p["name"]: sample_value(p) for p in spec_ep["body_params"]}
+    }
+
+def path_regex(ep):
+    pattern = "".join(re.escape(text) if kind == "literal" else "[^/]+" for kind, text in ep["path_parts"])
+    return re.compile("^" + pattern + "$")
+
+def match_spec(spec, method, path):
+    for ep, regex in spec:
+        if ep["method"] == method and regex.match(path):
+            return ep
+    return None
+
+def check_against_spec(spec_ep, query, headers, body):
+    """
+    Checks any request against the endpoint's declared parameters. Returns
+    (problems, warnings): undeclared or missing required parameters are problems,
+    declared optional query params the client never sends are warnings.
+    """
+    problems = []
+    warnings = []
+    body = body if isinstance(body, dict) else {}
+
+    declared_query = {p["name"] for p in spec_ep["query_params"]}
+    unknown = sorted(set(query) - declared_query)
+    if unknown:
+        problems.append(f"undeclared query params: {unknown}")
+    missing = [p["name"] for p in spec_ep["query_params"] if p["required"] and p["name"] not in query]
+    if missing:
+        problems.append(f"missing required query params: {missing}")
+    unsent = [p["name"] for p in spec_ep["query_params"] if not p["required"] and p["name"] not in query]
+    if unsent:
+        warnings.append(f"optional query params never sent: {unsent}")
+
+    declared_body = {p["name"] for p in spec_ep["body_params"]}
+    unknown = sorted(set(body) - declared_body)
+    if unknown:
+        problems.append(f"undeclared body fields: {unknown}")
+    missing = [p["name"] for p in spec_ep["body_params"] if p["required"] and p["name"] not in body]
+    if missing:
+        problems.append(f"missing required body fields: {missing}")
+    if declared_body and headers.get("Content-Type") != "application/json":
+        problems.append("Content-Type is not application/json")
+
+    missing = [h for h in spec_ep["headers"] if not headers.get(h)]
+    if missing:
+        problems.append(f"missing headers: {missing}")
+    return problems, warnings
+
+def check_against_expected(expected, method, path, query, body):
+    """
+    Contract-phase check: every parameter the client sent must carry the sample
+    argument for that parameter, so swapped or misrouted arguments show up.
+    """
+    problems = []
+    body = body if isinstance(body, dict) else {}
+    if method != expected["method"]:
+        problems.append(f"method {method} != {expected['method']}")
+    if path != expected["path"]:
+        problems.append(f"path {path} != {expected['path']}")
+    for location, sent, wanted in (("query param", query, expected["query"]), ("body field", body, expected["body"])):
+        for name, value in sent.items():
+            if name in wanted and value != wanted[name]:
+                problems.append(f"{location} {name} = {value!r}, expected {wanted[name]!r}")
+    return problems
+
+# ---------------- Mock Server ----------------
+
+def start_mock_server(spec, targets):
+    """
+    Serves every extracted endpoint on 127.0.0.1. A contract-phase request is
+    checked against the spec endpoint its call was generated from (`targets`
+    maps call name -> spec endpoint, or None when the spec has no such
+    endpoint); any other request against whichever endpoint its path matches.
+    Returns (server, checks) where checks maps call name -> (problems, warnings).
+    """
+    checks = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def handle_any(self):
+            parts = urlsplit(self.path)
+            path = unquote(parts.path)
+            query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else None
+            except json.JSONDecodeError:
+                body = raw.decode("utf-8", errors="replace")
+
+            call = self.headers.get(CALL_HEADER)
+            spec_ep = targets.get(call) if call else match_spec(spec, self.command, path)
+            if spec_ep is None:
+                problems, warnings = ["no matching endpoint in extracted spec"], []
+            else:
+                problems, warnings = check_against_spec(spec_ep, query, self.headers, body)
+                if call:
+                    problems += check_against_expected(expected_request(spec_ep), self.command, path, query, body)
+
+            if call:
+                with lock:
+                    checks[call] = (problems, warnings)
+
+            status = 200 if not problems else (404 if spec_ep is None else 422)
+            payload = json.dumps({"ok": not problems, "problems": problems}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PUT = do_DELETE = do_PATCH = handle_any
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # The default backlog of 5 drops connections under the load phase.
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, checks
+
+# ---------------- Verification ----------------
+
+def run_go(args, cwd):
+    result = subprocess.run(args, cwd=cwd, capture_output=True, text=True)
+    return result.returncode == 0, (result.stdout + result.stderr).strip()
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+@instrument_stage("verify_generated_code")
+def verify_generated_code(extracted_path=EXTRACTED_FILE, selected_path=SELECTED_FILE,
+                          go_file=emit_go.OUTPUT_FILE, concurrency=8, iterations=20,
+                          report_path=REPORT_FILE):
+    """
+    Offline contract test for the generated Go client: go vet / go build it with
+    a harness, run every call against a local mock server built from the
+    extracted spec, and report per-endpoint pass/fail plus latency and throughput.
+    """
+    go = shutil.which("go")
+    if go is None:
+        raise RuntimeError("Go toolchain not found on PATH; install Go to verify generated code.")
+    if not os.path.exists(go_file):
+        raise FileNotFoundError(f"{go_file} not found; generate code first.")
+    if not os.path.exists(extracted_path):
+        raise FileNotFoundError(f"{extracted_path} not found.")
+
+    with open(extracted_path, "r") as f:
+        spec_ir = build_ir(json.load(f))
+    spec = [(ep, path_regex(ep)) for ep in spec_ir]
+    by_route = {}
+    for ep in spec_ir:
+        by_route.setdefault((ep["method"], ep["path"]), ep)
+
+    _, ir = load_ir(selected_path)
+    targets = {ep["name"]: by_route.get((ep["method"], ep["path"])) for ep in ir}
+
+    report = {"build": {}, "endpoints": {}, "load": {}}
+
+    with tempfile.TemporaryDirectory(prefix="projectz-contract-") as workdir:
+        shutil.copy(go_file, os.path.join(workdir, "client.go"))
+        with open(os.path.join(workdir, "harness.go"), "w") as f:
+            f.write(build_harness(ir))
+        with open(os.path.join(workdir, "go.mod"), "w") as f:
+            f.write("module contracttest\n\ngo 1.18\n")
+
+        for step, args in (("vet", [go, "vet", "."]), ("build", [go, "build", "-o", "harness", "."])):
+            ok, output = run_go(args, workdir)
+            report["build"][step] = {"ok": ok, "output": output}
+            if not ok:
+                print(f"[ERROR] go {step} failed:\n{output}")
+                return write_report(report, report_path)
+
+        server, checks = start_mock_server(spec, targets)
+        try:
+            target = f"http://127.0.0.1:{server.server_address[1]}"
+            ok, output = run_go(
+                [os.path.join(workdir, "harness"), target, str(concurrency), str(iterations)], workdir
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    if not ok:
+        report["build"]["run"] = {"ok": False, "output": output}
+        print(f"[ERROR] Harness failed:\n{output}")
+        return write_report(report, report_path)
+
+    latencies = {}
+    load_errors = {}
+    elapsed_ms = None
+    for line in output.splitlines():
+        if not line.startswith("{"):
+            continue
+        result = json.loads(line)
+        name = result.get("name")
+        if result["phase"] == "contract":
+            problems, warnings = checks.get(name, (["request never reached the mock server"], []))
+            problems = list(problems)
+            if result.get("error"):
+                problems.insert(0, result["error"])
+            report["endpoints"][name] = {
+                "passed": not problems and result.get("status") == 200,
+                "status": result.get("status"),
+                "problems": problems,
+                "warnings": warnings,
+                "latency_ms": result["latency_ms"]
+            }
+        elif result["phase"] == "load":
+            latencies.setdefault(name, []).append(result["latency_ms"])
+            if result.get("error") or result.get("status") != 200:
+                load_errors[name] = load_errors.get(name, 0) + 1
+        elif result["phase"] == "summary":
+            elapsed_ms = result["latency_ms"]
+
+    total_calls = sum(len(v) for v in latencies.values())
+    report["load"] = {
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "calls": total_calls,
+        "elapsed_ms": elapsed_ms,
+        "throughput_rps": round(total_calls / (elapsed_ms / 1000), 1) if elapsed_ms else None,
+        "endpoints": {
+            name: {
+                "p50_ms": percentile(values, 0.5),
+                "p95_ms": percentile(values, 0.95),
+                "errors": load_errors.get(name, 0)
+            } for name, values in latencies.items()
+        }
+    }
+
+    passed = sum(1 for r in report["endpoints"].values() if r["passed"])
+    annotate(endpoints=len(report["endpoints"]), passed=passed)
+    print(f"Contract tests: {passed}/{len(report['endpoints'])} endpoint(s) passed, "
+          f"{report['load']['throughput_rps']} req/s under load")
+    return write_report(report, report_path)
+
+def write_report(report, report_path):
+    build_ok = all(step["ok"] for step in report["build"].values())
+    report["passed"] = build_ok and bool(report["endpoints"]) and \
+        all(r["passed"] for r in report["endpoints"].values())
+
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Contract report saved to: {report_path}")
+    return report
+
+if __name__ == "__main__":
+    verify_generated_code()
@@ -2,31 +2,87 @@
 
 import argparse
 import os
-import subprocess
 from extract.fetch_html import extract_html
 from extract.fetch_pdf import extract_pdf
 from extract.preprocess import preprocess_document
-from extract.llm_infer import extract_api_endpoints
+from extract.llm_infer import extract_api_endpoints, reinfer_endpoints
+from extract.postprocess import parse_llm_output
+from extract.openapi import import_openapi, import_linked_spec, export_openapi
+from extract.batch import expand_inputs, run_batch, BATCH_OUTPUT_DIR
+from extract.streaming import intermediate_paths, LOW_MEMORY
 
 def is_pdf(file_path):
     return file_path.lower().endswith(".pdf")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="API Documentation Extractor")
-    parser.add_argument("--input", required=True, help="URL or PDF file path")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="URL, PDF file path or OpenAPI/Swagger spec")
+    source.add_argument("--batch", nargs="+", metavar="INPUT",
+                        help="Batch mode: URLs, paths or glob patterns (e.g. 'docs/*.pdf')")
+    source.add_argument("--manifest", help="Batch mode: file listing one input per line, or a JSON list")
+    source.add_argument("--reinfer", metavar="IDS",
+                        help="Re-run only the chunks behind these endpoint ids (e.g. 3,7) of the last extraction")
+    parser.add_argument("--export-openapi", metavar="PATH",
+                        help="Also write the extracted endpoints as an OpenAPI 3 document")
+    parser.add_argument("--low-memory", action="store_true", default=LOW_MEMORY,
+                        help="Stream JSON Lines intermediates so memory stays flat for huge documents")
+
+    batch = parser.add_argument_group("batch options")
+    batch.add_argument("--output-dir", default=BATCH_OUTPUT_DIR, help="Per-document output root")
+    batch.add_argument("--max-documents", type=int, default=4, help="Documents processed at once")
+    batch.add_argument("--max-browsers", type=int, default=2, help="Concurrent headless browsers")
+    batch.add_argument("--max-pdf-workers", type=int, default=2, help="PDF extraction processes")
+    batch.add_argument("--max-llm", type=int, default=4, help="Concurrent LLM requests")
     args = parser.parse_args()
+
+    if args.batch or args.manifest:
+        inputs = expand_inputs(args.batch, args.manifest)
+        print(f"Batch of {len(inputs)} input(s) received")
+        results = run_batch(
+            inputs,
+            output_dir=args.output_dir,
+            max_documents=args.max_documents,
+            max_browsers=args.max_browsers,
+            max_pdf_workers=args.max_pdf_workers,
+            max_llm=args.max_llm,
+            low_memory=args.low_memory
+        )
+        exit(0 if all(r["status"] != "failed" for r in results) else 1)
+
+    raw_path, cleaned_path = intermediate_paths("output", args.low_memory)
+
+    if args.reinfer:
+        ids = [int(i) for i in args.reinfer.split(",") if i.strip().isdigit()]
+        updated = reinfer_endpoints(ids, cleaned_path=cleaned_path)
+        if updated is None:
+            exit(1)
+        print(f"{len(updated)} endpoint(s) now come from the re-inferred chunks")
+        exit(0)
+
     input_path = args.input.strip()
 
     print(f"Input received: {input_path}")
 
+    # Step 0: Published OpenAPI/Swagger specs skip scraping and inference entirely
+    if import_openapi(input_path) is not None:
+        if args.export_openapi:
+            export_openapi(out_path=args.export_openapi)
+        exit(0)
+
     # Step 1: Extract content
     if input_path.startswith("http"):
         print("Fetching HTML content...")
-        extract_html(input_path, output_path="output/raw_input.json")
+        extract_html(input_path, output_path=raw_path)
+
+        if import_linked_spec(raw_path) is not None:
+            if args.export_openapi:
+                export_openapi(out_path=args.export_openapi)
+            exit(0)
 
     elif is_pdf(input_path):
         print("Fetching PDF content...")
-        extract_pdf(input_path, output_path="output/raw_input.json")
+        extract_pdf(input_path, output_path=raw_path)
 
     else:
         print("Unsupported input type. Provide a URL or a PDF file.")
@@ -35,25 +91,28 @@ if __name__ == "__main__":
     # Step 2: Preprocess and chunk
     print("Preprocessing input...")
     chunks = preprocess_document(
-        json_path="output/raw_input.json",
+        json_path=raw_path,
         chunk_size=12000,
-        output_path="output/cleaned_input.json"
+        output_path=cleaned_path
     )
 
     if len(chunks) == 0:
         print("No valid content to process. Exiting.")
         exit(0)
 
-    print(f"Saved {len(chunks)} cleaned chunks to: output/cleaned_input.json")
+    print(f"Saved {len(chunks)} cleaned chunks to: {cleaned_path}")
 
     # Step 3: LLM Inference
     print("Running LLM inference...")
     extract_api_endpoints(
-        cleaned_path="output/cleaned_input.json",
+        cleaned_path=cleaned_path,
         raw_output_path="output/llm_output.txt"
     )
 
     # Step 4: Postprocess to final JSON
     print("Postprocessing LLM output...")
-    subprocess.run(["python", "-m", "extract.postprocess"])
+    parse_llm_output(cleaned_path=cleaned_path)
+
+    if args.export_openapi:
+        export_openapi(out_path=args.export_openapi)
     
\ No newline at end of file